@@ -1,49 +1,144 @@
 
+import threading
+from collections import namedtuple
 import requests
 import state
 from datetime import datetime, timedelta
 from log_utils import log_message
+from session_utils import get_api_session
+from retry_utils import send_with_retry
+import token_store
 
+# -------------------------------------------------------------------
+# Access tokens
+# -------------------------------------------------------------------
+# Tokens are cached per customer section. Concurrent callers that miss the
+# cache share one /oauth2/v1/token request, a token inside the refresh margin
+# is renewed in the background while it is still handed out, and a token the
+# FTS host rejected (401) is dropped once so every worker re-authenticates
+# with the same new token. token_store keeps them across restarts.
+# Operations capture customer_snapshot() once when they start and pass it
+# along, so a customer switch in the UI cannot redirect a running batch.
+CustomerSnapshot = namedtuple("CustomerSnapshot", "key host credentials config")
 
-def get_access_token():
-    if not all([state.oci_iam_base_url, state.oci_iam_scope, state.client_id, state.client_secret]):
-        log_message("ERROR! - Missing credentials in config file.")
-        return None
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _lock_for(customer_key):
+    with _locks_guard:
+        return _locks.setdefault(customer_key, threading.Lock())
+
+
+def customer_snapshot():
+    """
+    The selected customer section with its FTS host, IAM settings (base URL, scope, client id,
+    secret) and a copy of its config section for the per-customer tunables.
+    """
+    return CustomerSnapshot(
+        state.selected_customer or "default",
+        state.fts_host_name,
+        (state.oci_iam_base_url, state.oci_iam_scope, state.client_id, state.client_secret),
+        dict(state.customer_config),
+    )
 
-    customer_key = state.customer_config.get("CUSTOMER_NAME", state.customer_dropdown.get())
 
+def _cached(customer_key, client_id, margin):
+    """The cached entry when it belongs to client_id and stays valid for margin more seconds, else None."""
+    entry = state.token_cache.get(customer_key)
     if (
-        customer_key in state.token_cache and
-        "access_token" in state.token_cache[customer_key] and
-        "expires_at" in state.token_cache[customer_key] and
-        datetime.now() < state.token_cache[customer_key]["expires_at"]
+        entry and
+        entry.get("access_token") and
+        entry.get("client_id", client_id) == client_id and
+        "expires_at" in entry and
+        datetime.now() + timedelta(seconds=margin) < entry["expires_at"]
     ):
-        log_message(f"Using cached access token for {customer_key}.")
-        return state.token_cache[customer_key]["access_token"]
+        return entry
+    return None
 
-    log_message(f"Fetching new access token for {customer_key}...")
 
-    url = f"{state.oci_iam_base_url}/oauth2/v1/token"
+def _fetch_token(customer_key, credentials):
+    base_url, scope, client_id, client_secret = credentials
+    url = f"{base_url}/oauth2/v1/token"
     headers = {"Content-Type": "application/x-www-form-urlencoded"}
     data = {
         "grant_type": "client_credentials",
-        "scope": state.oci_iam_scope,
-        "client_id": state.client_id,
-        "client_secret": state.client_secret,
+        "scope": scope,
+        "client_id": client_id,
+        "client_secret": client_secret,
     }
 
     try:
-        response = requests.post(url, headers=headers, data=data)
+        response = send_with_retry("POST", url,
+                                   lambda: get_api_session(customer_key).post(url, headers=headers, data=data))
         response.raise_for_status()
         token_data = response.json()
 
+        lifetime = token_data.get("expires_in", 3600)
+        expires_at = datetime.now() + timedelta(seconds=lifetime)
         state.token_cache[customer_key] = {
             "access_token": token_data.get("access_token"),
-            "expires_at": datetime.now() + timedelta(seconds=token_data.get("expires_in", 3600))
+            "expires_at": expires_at,
+            # short-lived tokens are renewed halfway rather than on every call
+            "refresh_at": expires_at - timedelta(seconds=min(state.TOKEN_REFRESH_MARGIN_SECONDS, lifetime / 2)),
+            "client_id": client_id,
         }
 
+        token_store.save()
         log_message(f"New access token retrieved for {customer_key}.")
         return state.token_cache[customer_key]["access_token"]
     except requests.exceptions.RequestException as e:
         log_message(f"ERROR! - Failed to get access token for {customer_key} - {e}")
         return None
+
+
+def _refresh_in_background(customer_key, credentials):
+    lock = _lock_for(customer_key)
+    if not lock.acquire(blocking=False):
+        return  # a fetch for this customer is already running
+
+    def run():
+        try:
+            log_message(f"Refreshing access token for {customer_key} before it expires...")
+            _fetch_token(customer_key, credentials)
+        finally:
+            lock.release()
+
+    threading.Thread(target=run, name=f"token-refresh-{customer_key}", daemon=True).start()
+
+
+def get_access_token(customer=None):
+    """Access token of customer (a CustomerSnapshot; the selected customer when None)."""
+    customer = customer or customer_snapshot()
+    customer_key, credentials = customer.key, customer.credentials
+    if not all(credentials):
+        log_message("ERROR! - Missing credentials in config file.")
+        return None
+
+    client_id = credentials[2]
+    token_store.load()
+
+    entry = _cached(customer_key, client_id, state.TOKEN_EXPIRY_SAFETY_SECONDS)
+    if entry:
+        if datetime.now() >= entry.get("refresh_at", entry["expires_at"]):
+            _refresh_in_background(customer_key, credentials)
+        return entry["access_token"]
+
+    with _lock_for(customer_key):
+        # another caller may have fetched the token while we waited
+        entry = _cached(customer_key, client_id, state.TOKEN_EXPIRY_SAFETY_SECONDS)
+        if entry:
+            return entry["access_token"]
+
+        log_message(f"Fetching new access token for {customer_key}...")
+        return _fetch_token(customer_key, credentials)
+
+
+def invalidate_token(access_token, customer_key):
+    """Drop customer_key's access_token after the FTS host rejected it; later callers fetch one new token together."""
+    with _lock_for(customer_key):
+        entry = state.token_cache.get(customer_key)
+        if entry and entry.get("access_token") == access_token:
+            del state.token_cache[customer_key]
+            token_store.save()
+            log_message(f"Access token for {customer_key} was rejected, re-authenticating.")
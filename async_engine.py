@@ -0,0 +1,221 @@
+import os
+import time
+import asyncio
+import threading
+import state
+from log_utils import log_message
+from concurrency_utils import data_budget, THROTTLE_STATUSES
+from bandwidth_utils import throttle_async, is_limited
+from retry_utils import RETRY_STATUSES, is_retryable, backoff, retry_after_seconds, breaker_for
+
+try:
+    import aiohttp
+except ImportError:     # optional: without aiohttp every transfer stays on the thread pools
+    aiohttp = None
+
+# -------------------------------------------------------------------
+# asyncio transfer engine
+# -------------------------------------------------------------------
+# One event loop on one daemon thread runs small-file PAR transfers as
+# coroutines. Callers on any thread submit work and get a
+# concurrent.futures.Future back; the Tk mainloop is never involved.
+# Every transfer holds a slot of the shared data_budget and reports its
+# bytes, latency and throttling to it, like the thread-pool transfers do.
+# Disk I/O (open, write, close, rename) runs on the loop's default executor,
+# so a slow disk never stalls the other transfers on the loop.
+CHUNK_SIZE = 256 * 1024
+PART_SUFFIX = ".part"
+
+_loop = None
+_loop_lock = threading.Lock()
+_sessions = {}
+
+
+def is_available():
+    return aiohttp is not None and state.USE_ASYNC_ENGINE
+
+
+def accepts(file_size):
+    """True when a file of this size should go through the async engine rather than a worker thread."""
+    return is_available() and file_size is not None and file_size <= state.ASYNC_MAX_FILE_MB * 1024 * 1024
+
+
+def _ensure_loop():
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="fts-async-engine", daemon=True).start()
+    return _loop
+
+
+def submit(coro):
+    """Schedule a coroutine on the engine loop and return a concurrent.futures.Future."""
+    return asyncio.run_coroutine_threadsafe(coro, _ensure_loop())
+
+
+def _get_session(customer):
+    """Return the customer's aiohttp session; must be called on the engine loop."""
+    session = _sessions.get(customer)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(limit=state.ASYNC_MAX_CONCURRENCY, keepalive_timeout=30)
+        session = aiohttp.ClientSession(connector=connector,
+                                        timeout=aiohttp.ClientTimeout(total=None, sock_read=300))
+        _sessions[customer] = session
+    return session
+
+
+async def _in_thread(function, *args):
+    """Run a blocking disk call on the default executor and await its result."""
+    return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+
+
+async def _retrying(method, url, once):
+    """Run once() -> (ok, status, retry_after) under the shared retry policy and the host's circuit breaker."""
+    breaker = breaker_for(url)
+    for attempt in range(state.RETRY_ATTEMPTS + 1):
+        last = attempt == state.RETRY_ATTEMPTS
+        await breaker.wait_async()
+        try:
+            ok, status, retry_after = await once()
+        except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError):
+            breaker.record(False)
+            data_budget.record(throttled=True)  # like is_throttle_error on the thread pools
+            if last or not is_retryable(method, network_error=True):
+                raise
+            await asyncio.sleep(backoff(attempt))
+            continue
+
+        failing = status in RETRY_STATUSES
+        breaker.record(not failing)
+        if ok or not failing or last or not is_retryable(method, status):
+            return ok, status
+        await asyncio.sleep(backoff(attempt, retry_after_seconds(retry_after)))
+
+
+async def _upload_one(session, customer, file_path, access_uri):
+    file_name = os.path.basename(file_path)
+    error = {}
+
+    async def once():
+        size = await _in_thread(os.path.getsize, file_path)
+        file = await _in_thread(open, file_path, "rb")
+        try:
+            # aiohttp streams file objects in chunks read off the loop thread
+            async with session.put(access_uri, data=file) as response:
+                # as for threaded PUTs, the elapsed time covers the body, so no latency sample
+                data_budget.record(size, None, response.status in THROTTLE_STATUSES)
+                if response.status == 200:
+                    return True, response.status, None
+                error["text"] = await response.text()
+                return False, response.status, response.headers.get("Retry-After")
+        finally:
+            await _in_thread(file.close)
+
+    try:
+        ok, status = await _retrying("PUT", access_uri, once)
+    except Exception as e:
+        log_message(f"ERROR! - uploading file {file_name}: {str(e)}")
+        return False, None
+    if ok:
+        log_message(f"✅ File {file_name} uploaded successfully.")
+    else:
+        log_message(f"Failed to upload {file_name}. Error: {error.get('text')}")
+    return ok, status
+
+
+async def _download_one(session, customer, access_uri, file_path):
+    file_name = os.path.basename(file_path)
+    part_path = file_path + PART_SUFFIX
+    error = {}
+
+    async def once():
+        started = time.monotonic()
+        async with session.get(access_uri) as response:
+            latency = time.monotonic() - started
+            if response.status != 200:
+                data_budget.record(0, latency, response.status in THROTTLE_STATUSES)
+                error["text"] = f"HTTP {response.status}: {await response.text()}"
+                return False, response.status, response.headers.get("Retry-After")
+            limited = is_limited(customer)
+            received = 0
+            file = await _in_thread(open, part_path, "wb")
+            try:
+                async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                    if limited:
+                        await throttle_async(len(chunk), customer)
+                    await _in_thread(file.write, chunk)
+                    received += len(chunk)
+            finally:
+                await _in_thread(file.close)
+            data_budget.record(received, latency)
+            return True, response.status, None
+
+    try:
+        ok, status = await _retrying("GET", access_uri, once)
+        if ok:
+            await _in_thread(os.replace, part_path, file_path)
+    except Exception as e:
+        log_message(f"ERROR! - Failed to download {file_name}: {e}")
+        return False, None
+    if ok:
+        log_message(f"✅ {file_name} downloaded successfully.")
+    else:
+        log_message(f"ERROR! - Failed to download {file_name}: {error.get('text')}")
+    return ok, status
+
+
+async def _run_all(customer, jobs, transfer, on_result):
+    session = _get_session(customer)
+    semaphore = asyncio.Semaphore(state.ASYNC_MAX_CONCURRENCY)
+    results = {}
+
+    async def run(key, *args):
+        # the fixed semaphore caps the coroutines; the shared adaptive budget decides how many transfer
+        async with semaphore:
+            await data_budget.acquire_async()
+            try:
+                ok, status = await transfer(session, customer, *args)
+            finally:
+                data_budget.release()
+        results[key] = ok
+        if on_result:
+            on_result(key, ok, status)
+
+    await asyncio.gather(*(run(*job) for job in jobs))
+    return results
+
+
+def upload_many(items, on_result=None, customer=None):
+    """
+    Upload (file_path, access_uri) pairs as coroutines. Returns a Future resolving to
+    {file_path: succeeded}; on_result(file_path, ok, http_status) is called on the engine thread
+    as each finishes. customer (a section name) picks the session and the bandwidth bucket.
+    """
+    customer = customer or state.selected_customer or "default"
+    jobs = [(file_path, file_path, access_uri) for file_path, access_uri in items]
+    return submit(_run_all(customer, jobs, _upload_one, on_result))
+
+
+def download_many(items, on_result=None, customer=None):
+    """
+    Download (key, access_uri, file_path) triples as coroutines through .part files.
+    Returns a Future resolving to {key: succeeded}; customer as for upload_many.
+    """
+    customer = customer or state.selected_customer or "default"
+    return submit(_run_all(customer, list(items), _download_one, on_result))
+
+
+async def _close(customer):
+    for key in [k for k in _sessions if customer is None or k == customer]:
+        await _sessions.pop(key).close()
+
+
+def close_async_sessions(customer=None):
+    """Close engine sessions for one customer, or all of them; no-op if the engine never started."""
+    if _loop is None:
+        return
+    try:
+        submit(_close(customer)).result(timeout=10)
+    except Exception as e:
+        log_message(f"ERROR! - Failed to close async sessions: {e}")
@@ -0,0 +1,181 @@
+import time
+import asyncio
+import threading
+from datetime import datetime
+import state
+from log_utils import log_message
+import config_store
+
+# -------------------------------------------------------------------
+# Bandwidth limiting
+# -------------------------------------------------------------------
+# Every upload/download stream draws from two token buckets: one for the
+# customer the transfer belongs to (its CustomerSnapshot key, fixed when the
+# operation started) and one global. Limits come from config.ini:
+#   [<customer>] or [settings]
+#   bandwidth_limit_mbps = 50
+#   bandwidth_schedule = 08:00-18:00=20, 18:00-08:00=0
+# A schedule window overrides the plain limit while it is active; 0 means unlimited.
+GLOBAL_SECTION = "settings"
+BYTES_PER_MBPS = 1000 * 1000 // 8
+RATE_REFRESH_SECONDS = 30       # how often a bucket re-reads its limit and schedule
+BURST_SECONDS = 1.0             # bucket capacity, in seconds of traffic
+
+
+def _to_minutes(value):
+    hours, minutes = value.strip().split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def parse_schedule(text):
+    """Parse 'HH:MM-HH:MM=Mbps, ...' into [(start_minute, end_minute, mbps)]."""
+    windows = []
+    for entry in (text or "").split(","):
+        if not entry.strip():
+            continue
+        try:
+            span, mbps = entry.split("=")
+            start, end = span.split("-")
+            windows.append((_to_minutes(start), _to_minutes(end), float(mbps)))
+        except ValueError:
+            log_message(f"ERROR! - Invalid bandwidth_schedule entry '{entry.strip()}', ignored")
+    return windows
+
+
+def limit_for(limit_mbps, schedule, now=None):
+    """Return the limit in bytes/s in force at now (0 = unlimited)."""
+    now = now or datetime.now()
+    minute = now.hour * 60 + now.minute
+    for start, end, mbps in parse_schedule(schedule):
+        in_window = start <= minute < end if start <= end else (minute >= start or minute < end)
+        if in_window:
+            return int(mbps * BYTES_PER_MBPS)
+    try:
+        return int(float(limit_mbps or 0) * BYTES_PER_MBPS)
+    except ValueError:
+        log_message(f"ERROR! - Invalid bandwidth_limit_mbps '{limit_mbps}', treated as unlimited")
+        return 0
+
+
+class TokenBucket:
+    """Token bucket in bytes/s; callers take tokens up front and wait out any debt."""
+
+    def __init__(self, section):
+        self.section = section
+        self._rate = 0
+        self._tokens = 0.0
+        self._last = time.monotonic()
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def _refresh_rate(self, now):
+        if now - self._checked < RATE_REFRESH_SECONDS:
+            return
+        self._checked = now
+
+        settings = {}
+        config = config_store.get()  # re-parsed only when config.ini changed
+        if config.has_section(self.section):
+            settings = config[self.section]
+        rate = limit_for(settings.get("bandwidth_limit_mbps"), settings.get("bandwidth_schedule"))
+
+        if rate != self._rate:
+            shown = f"{rate / BYTES_PER_MBPS:g} Mbps" if rate else "unlimited"
+            log_message(f"Bandwidth limit for [{self.section}] set to {shown}")
+            self._rate = rate
+            self._tokens = min(self._tokens, rate * BURST_SECONDS)
+
+    @property
+    def limited(self):
+        with self._lock:
+            self._refresh_rate(time.monotonic())
+            return self._rate > 0
+
+    def reserve(self, nbytes):
+        """Take nbytes of tokens and return how long the caller must wait before sending them."""
+        with self._lock:
+            now = time.monotonic()
+            self._refresh_rate(now)
+            if not self._rate:
+                return 0.0
+
+            self._tokens = min(self._tokens + (now - self._last) * self._rate, self._rate * BURST_SECONDS)
+            self._last = now
+            self._tokens -= nbytes
+            return -self._tokens / self._rate if self._tokens < 0 else 0.0
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def _bucket(section):
+    with _buckets_lock:
+        bucket = _buckets.get(section)
+        if bucket is None:
+            bucket = TokenBucket(section)
+            _buckets[section] = bucket
+        return bucket
+
+
+def _active_buckets(customer=None):
+    buckets = [_bucket(GLOBAL_SECTION)]
+    customer = customer or state.selected_customer
+    if customer:
+        buckets.append(_bucket(customer))
+    return buckets
+
+
+def is_limited(customer=None):
+    """True when the customer's (the selected one when None) or the global limit is in force."""
+    return any(bucket.limited for bucket in _active_buckets(customer))
+
+
+def reserve(nbytes, customer=None):
+    return max(bucket.reserve(nbytes) for bucket in _active_buckets(customer))
+
+
+def throttle(nbytes, customer=None):
+    """Block the calling stream until nbytes fit within the customer and global limits."""
+    delay = reserve(nbytes, customer)
+    if delay > 0:
+        time.sleep(delay)
+
+
+async def throttle_async(nbytes, customer=None):
+    delay = reserve(nbytes, customer)
+    if delay > 0:
+        await asyncio.sleep(delay)
+
+
+def reset_buckets():
+    """Drop all buckets so limits are re-read from config.ini on the next transfer."""
+    with _buckets_lock:
+        _buckets.clear()
+
+
+class ThrottledReader:
+    """Streamable file wrapper for request bodies that paces reads through the bandwidth buckets."""
+
+    BLOCK_SIZE = 64 * 1024
+
+    def __init__(self, file, length, customer=None):
+        self._file = file
+        self._length = length
+        self._customer = customer
+
+    def __len__(self):
+        return self._length
+
+    def read(self, size=-1):
+        data = self._file.read(size)
+        if data:
+            throttle(len(data), self._customer)
+        return data
+
+    def __iter__(self):
+        while True:
+            block = self.read(self.BLOCK_SIZE)
+            if not block:
+                return
+            yield block
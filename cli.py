@@ -0,0 +1,181 @@
+import os
+import sys
+import json
+import getpass
+import argparse
+import requests
+import state
+from log_utils import log_message
+from encryption_utils import unlock_encryption
+from config_utils import apply_customer_config
+from transfer_journal import UploadJournal
+from transfer_service import (
+    TransferError, AuthError, fetch_prefixes, fetch_files, upload_batch, download_batch, delete_batch,
+    move_batch, apply_rename_template
+)
+
+# -------------------------------------------------------------------
+# Headless entry point: python main.py --cli --customer NAME <command> ...
+# Prints one JSON document on stdout; nothing on this path imports Tkinter.
+# -------------------------------------------------------------------
+EXIT_OK = 0
+EXIT_FAILED = 1             # the request failed, or some files did not transfer
+EXIT_USAGE = 2              # bad arguments or configuration (same code argparse uses)
+EXIT_AUTH = 3               # wrong encryption password or no access token
+
+PASSWORD_ENV = "FTS_ENCRYPTION_PASSWORD"
+
+
+def _emit(payload):
+    print(json.dumps(payload))
+    sys.stdout.flush()
+
+
+def _read_password():
+    """Encryption password from the environment, else from stdin (prompting only on a terminal)."""
+    password = os.environ.get(PASSWORD_ENV)
+    if password:
+        return password
+    if sys.stdin.isatty():
+        return getpass.getpass("Encryption password: ")
+    return sys.stdin.readline().rstrip("\r\n")
+
+
+def _summary(results):
+    succeeded = [name for name, ok in results.items() if ok]
+    failed = [name for name, ok in results.items() if not ok]
+    code = EXIT_OK if not failed else EXIT_FAILED
+    return {"succeeded": succeeded, "failed": failed}, code
+
+
+def _cmd_list_prefixes(args):
+    return {"prefixes": fetch_prefixes()}, EXIT_OK
+
+
+def _cmd_list(args):
+    files = fetch_files(args.prefix)
+    return {"prefix": args.prefix, "count": len(files), "files": files}, EXIT_OK
+
+
+def _cmd_upload(args):
+    file_paths = [os.path.abspath(p) for p in args.files]
+    missing = [p for p in file_paths if not os.path.isfile(p)]
+    if missing:
+        return {"error": "Files not found.", "missing": missing}, EXIT_USAGE
+
+    journal = UploadJournal(state.selected_customer, args.prefix)
+    journal.start_batch(file_paths)
+    return _summary(upload_batch(file_paths, args.prefix, journal))
+
+
+def _cmd_resume_upload(args):
+    journal = UploadJournal.load(state.selected_customer, args.prefix)
+    if not journal:
+        return {"error": f"No interrupted upload batch found for '{args.prefix}'."}, EXIT_USAGE
+
+    pending_files = journal.pending_files()
+    if not pending_files:
+        journal.remove()
+        return {"succeeded": [], "failed": []}, EXIT_OK
+    return _summary(upload_batch(pending_files, args.prefix, journal))
+
+
+def _cmd_download(args):
+    os.makedirs(args.dest, exist_ok=True)
+    return _summary(download_batch(args.files, args.prefix, args.dest))
+
+
+def _cmd_delete(args):
+    return _summary(delete_batch(args.files, args.prefix))
+
+
+def _cmd_move(args):
+    if args.new_name and len(args.files) > 1:
+        return {"error": "--new-name can only be used when moving a single file."}, EXIT_USAGE
+    if args.new_name and args.rename:
+        return {"error": "Use either --new-name or --rename."}, EXIT_USAGE
+    if args.to == args.prefix:
+        return {"error": "Target prefix cannot be the current one."}, EXIT_USAGE
+
+    new_names = [args.new_name] if args.new_name else apply_rename_template(args.rename, args.files)
+    moves = [(name, args.to, new_name) for name, new_name in zip(args.files, new_names)]
+    payload, code = _summary(move_batch(args.prefix, moves))
+    payload["target"] = args.to
+    return payload, code
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="main.py --cli", description="File Transfer Service command line.")
+    parser.add_argument("--customer", required=True, help="customer section in config.ini")
+    parser.add_argument("--config", default=state.CONFIG_FILE, help="path to config.ini")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list-prefixes", help="list storage prefixes").set_defaults(handler=_cmd_list_prefixes)
+
+    cmd = commands.add_parser("list", help="list files of a prefix")
+    cmd.add_argument("--prefix", required=True)
+    cmd.set_defaults(handler=_cmd_list)
+
+    cmd = commands.add_parser("upload", help="upload local files to a prefix")
+    cmd.add_argument("--prefix", required=True)
+    cmd.add_argument("files", nargs="+")
+    cmd.set_defaults(handler=_cmd_upload)
+
+    cmd = commands.add_parser("resume-upload", help="resume the last interrupted upload batch of a prefix")
+    cmd.add_argument("--prefix", required=True)
+    cmd.set_defaults(handler=_cmd_resume_upload)
+
+    cmd = commands.add_parser("download", help="download files of a prefix")
+    cmd.add_argument("--prefix", required=True)
+    cmd.add_argument("--dest", default=".", help="destination directory")
+    cmd.add_argument("files", nargs="+")
+    cmd.set_defaults(handler=_cmd_download)
+
+    cmd = commands.add_parser("delete", help="delete files from a prefix")
+    cmd.add_argument("--prefix", required=True)
+    cmd.add_argument("files", nargs="+")
+    cmd.set_defaults(handler=_cmd_delete)
+
+    cmd = commands.add_parser("move", help="move files to another prefix")
+    cmd.add_argument("--prefix", required=True, help="current prefix")
+    cmd.add_argument("--to", required=True, help="target prefix")
+    cmd.add_argument("--new-name", help="new file name (single file only)")
+    cmd.add_argument("--rename", help="rename template, e.g. '{stem}_{date}{ext}' ({name} {stem} {ext} {n} {date})")
+    cmd.add_argument("files", nargs="+")
+    cmd.set_defaults(handler=_cmd_move)
+
+    return parser
+
+
+def run_cli(argv):
+    """Run one CLI command and return the process exit code."""
+    args = build_parser().parse_args(argv)
+    state.CONFIG_FILE = args.config
+
+    if not os.path.exists(state.CONFIG_FILE):
+        _emit({"ok": False, "command": args.command, "error": f"Config file not found: {state.CONFIG_FILE}"})
+        return EXIT_USAGE
+
+    password = _read_password()
+    if not password or not unlock_encryption(password):
+        _emit({"ok": False, "command": args.command, "error": "Wrong or missing encryption password."})
+        return EXIT_AUTH
+
+    error = apply_customer_config(args.customer)
+    if error:
+        _emit({"ok": False, "command": args.command, "error": error})
+        return EXIT_USAGE
+
+    log_message(f"CLI command: {args.command} for customer {args.customer}")
+    try:
+        result, code = args.handler(args)
+    except TransferError as e:
+        log_message(f"ERROR! - {e}")
+        result = {"error": str(e)}
+        code = EXIT_AUTH if isinstance(e, AuthError) else EXIT_FAILED
+    except requests.exceptions.RequestException as e:
+        log_message(f"ERROR! - {args.command} failed: {e}")
+        result, code = {"error": str(e)}, EXIT_FAILED
+
+    _emit({"ok": code == EXIT_OK, "command": args.command, **result})
+    return code
@@ -0,0 +1,199 @@
+import time
+import asyncio
+import threading
+import state
+from log_utils import log_message
+
+THROTTLE_STATUSES = (429, 503)
+GROWTH_THRESHOLD = 1.05      # throughput must beat the previous window by 5% to grow
+LATENCY_TOLERANCE = 2.0      # back off when window latency exceeds twice the best seen
+LATENCY_BACKOFF = 0.75
+THROTTLE_BACKOFF = 0.5
+
+
+class TransferBudget:
+    """Counting limit on concurrent streams, shared by every transfer in the app."""
+
+    def __init__(self, limit):
+        self._limit = limit
+        self._in_use = 0
+        self._cond = threading.Condition()
+        self._async_waiters = []    # (loop, future) of coroutines in acquire_async
+
+    @property
+    def limit(self):
+        return self._limit
+
+    @property
+    def in_use(self):
+        return self._in_use
+
+    def acquire(self):
+        """Block until a stream slot is free and take it."""
+        with self._cond:
+            while self._in_use >= self._limit:
+                self._cond.wait()
+            self._in_use += 1
+
+    def try_acquire(self):
+        """Take a slot only if one is free right now; used for opportunistic extra streams."""
+        with self._cond:
+            if self._in_use >= self._limit:
+                return False
+            self._in_use += 1
+            return True
+
+    async def acquire_async(self):
+        """acquire() for coroutines: waits on the event loop, woken when a slot is freed."""
+        loop = asyncio.get_running_loop()
+        while not self.try_acquire():
+            waiter = loop.create_future()
+            with self._cond:
+                if self._in_use < self._limit:
+                    continue  # freed since try_acquire
+                self._async_waiters.append((loop, waiter))
+            await waiter
+
+    def release(self):
+        with self._cond:
+            self._in_use -= 1
+            self._cond.notify()
+            self._wake_async()
+
+    def _wake_async(self):
+        # every waiting coroutine retries; those that lose the slot to another caller wait again
+        for loop, waiter in self._async_waiters:
+            loop.call_soon_threadsafe(_resolve, waiter)
+        self._async_waiters = []
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class AdaptiveBudget(TransferBudget):
+    """
+    TransferBudget whose limit follows AIMD: every window it grows by a fixed step while
+    aggregate throughput keeps rising and the budget is saturated, and it shrinks
+    multiplicatively on 429/503/timeouts or when latency climbs well above the best seen.
+    """
+
+    def __init__(self, name, initial, minimum, maximum):
+        super().__init__(initial)
+        self.name = name
+        self.minimum = minimum
+        self.maximum = maximum
+        self._window_start = time.monotonic()
+        self._window_bytes = 0
+        self._window_count = 0
+        self._window_latency = 0.0
+        self._window_timed = 0
+        self._window_saturated = False
+        self._last_rate = None
+        self._best_latency = None
+        self._last_backoff = 0.0
+
+    def acquire(self):
+        super().acquire()
+        with self._cond:
+            if self._in_use >= self._limit:
+                self._window_saturated = True
+
+    def try_acquire(self):
+        with self._cond:
+            if self._in_use >= self._limit:
+                self._window_saturated = True  # a caller had to wait
+                return False
+            self._in_use += 1
+            return True
+
+    def record(self, nbytes=0, latency=None, throttled=False):
+        """Feed one completed request into the controller."""
+        with self._cond:
+            now = time.monotonic()
+            if throttled:
+                self._back_off(now, THROTTLE_BACKOFF, "throttled or timed out")
+                return
+
+            self._window_bytes += nbytes
+            self._window_count += 1
+            if latency is not None:
+                self._window_latency += latency
+                self._window_timed += 1
+
+            if now - self._window_start >= state.CONCURRENCY_WINDOW_SECONDS:
+                self._evaluate(now)
+
+    def _evaluate(self, now):
+        elapsed = now - self._window_start
+        # data budgets are judged on bytes/s, API budgets on requests/s
+        rate = (self._window_bytes or self._window_count) / elapsed
+        latency = self._window_latency / self._window_timed if self._window_timed else None
+
+        if latency is not None and (self._best_latency is None or latency < self._best_latency):
+            self._best_latency = latency
+
+        if latency is not None and latency > self._best_latency * LATENCY_TOLERANCE:
+            self._back_off(now, LATENCY_BACKOFF, f"latency {latency:.2f}s vs best {self._best_latency:.2f}s")
+        elif self._window_saturated and (self._last_rate is None or rate >= self._last_rate * GROWTH_THRESHOLD):
+            self._set_limit(self._limit + state.CONCURRENCY_STEP, "throughput rising")
+
+        self._last_rate = rate
+        self._window_start = now
+        self._window_bytes = 0
+        self._window_count = 0
+        self._window_latency = 0.0
+        self._window_timed = 0
+        self._window_saturated = self._in_use >= self._limit
+
+    def _back_off(self, now, factor, reason):
+        # one decrease per window, so a burst of 503s from parallel requests halves only once
+        if now - self._last_backoff < state.CONCURRENCY_WINDOW_SECONDS:
+            return
+        self._last_backoff = now
+        self._last_rate = None
+        self._set_limit(int(self._limit * factor), reason)
+
+    def _set_limit(self, new_limit, reason):
+        new_limit = max(self.minimum, min(self.maximum, new_limit))
+        if new_limit == self._limit:
+            return
+        log_message(f"Concurrency [{self.name}] limit {self._limit} -> {new_limit} ({reason})")
+        self._limit = new_limit
+        self._cond.notify_all()
+        self._wake_async()
+
+
+def _resolve(waiter):
+    if not waiter.done():  # a cancelled waiter is left alone
+        waiter.set_result(None)
+
+
+def is_throttle_error(error):
+    """Timeouts and dropped connections count as the server pushing back."""
+    import requests  # imported on first use to keep it off the UI startup path
+    return isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError))
+
+
+def response_feedback(budget):
+    """requests response hook feeding status and latency of every response into a budget."""
+
+    def hook(response, *args, **kwargs):
+        if response.request.method == "PUT":
+            # a PUT's elapsed time covers the whole body upload, so it says nothing about latency
+            length = response.request.headers.get("Content-Length")
+            latency = None
+        else:
+            length = response.headers.get("Content-Length")
+            latency = response.elapsed.total_seconds()
+        nbytes = int(length) if length and str(length).isdigit() else 0
+        budget.record(nbytes, latency, response.status_code in THROTTLE_STATUSES)
+
+    return hook
+
+
+data_budget = AdaptiveBudget("data", state.MAX_THREADS, state.CONCURRENCY_MIN, state.CONCURRENCY_MAX)
+api_budget = AdaptiveBudget("api", state.MAX_THREADS, state.CONCURRENCY_MIN, state.API_CONCURRENCY_MAX)
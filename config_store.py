@@ -0,0 +1,110 @@
+import os
+import stat
+import threading
+from configparser import ConfigParser
+import state
+from log_utils import log_message
+from encryption_utils import decrypt_secret
+
+# -------------------------------------------------------------------
+# Config store
+# -------------------------------------------------------------------
+# config.ini is parsed once and parsed again only when its modification time
+# or size changed, so selecting customers and opening the config dialog cost a
+# stat() instead of a full read. Decrypted client secrets are memoized per
+# section (keyed by the encrypted value, so an edited secret is decrypted
+# again). Writes go to a temp file that replaces config.ini in one step; a
+# reader sees the old file or the new one, never a half-written one.
+DECRYPTION_FAILED = "[Decryption Failed]"
+
+_lock = threading.RLock()
+_parsed = None
+_signature = None
+_secrets = {}
+
+
+def _file_signature():
+    path = os.path.abspath(state.CONFIG_FILE)
+    try:
+        info = os.stat(path)
+    except OSError:
+        return path, None, None
+    return path, info.st_mtime_ns, info.st_size
+
+
+def get():
+    """Return the parsed config.ini, shared between callers: read it, do not modify it."""
+    global _parsed, _signature
+    signature = _file_signature()
+    with _lock:
+        if _parsed is None or signature != _signature:
+            cfg = ConfigParser()
+            if signature[1] is not None:
+                cfg.read(signature[0])
+            _parsed, _signature = cfg, signature
+        return _parsed
+
+
+def copy(include_encryption=True):
+    """A private copy of config.ini to edit and pass to write()."""
+    cfg = ConfigParser()
+    cfg.read_dict(get())
+    if not include_encryption and cfg.has_section("encryption"):
+        cfg.remove_section("encryption")
+    return cfg
+
+
+def write(cfg):
+    """Replace config.ini with cfg atomically and make it the cached config."""
+    global _parsed, _signature
+    path = os.path.abspath(state.CONFIG_FILE)
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with _lock:
+        try:
+            # the file holds the salt and encrypted secrets: keep its mode, and start new ones private
+            mode = stat.S_IMODE(os.stat(path).st_mode) if os.path.exists(path) else 0o600
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as f:
+                os.chmod(temp_path, mode)
+                cfg.write(f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        parsed = ConfigParser()
+        parsed.read_dict(cfg)
+        _parsed, _signature = parsed, _file_signature()
+
+
+def int_setting(settings, key, default):
+    """Integer tunable from a config section (e.g. a CustomerSnapshot's config); default when unset or invalid."""
+    value = settings.get(key)
+    try:
+        return int(value) if value else default
+    except ValueError:
+        log_message(f"ERROR! - Invalid value for {key}: {value}, using {default}")
+        return default
+
+
+def secret(section, encrypted_value):
+    """decrypt_secret(encrypted_value), memoized for section; failed decryptions are not kept."""
+    key = (section, encrypted_value)
+    with _lock:
+        if key in _secrets:
+            return _secrets[key]
+
+    value = decrypt_secret(encrypted_value)
+    if value != DECRYPTION_FAILED:
+        with _lock:
+            _secrets[key] = value
+    return value
+
+
+def forget_secrets(section=None):
+    """Drop memoized secrets of one section (all when None)."""
+    with _lock:
+        for key in [k for k in _secrets if section is None or k[0] == section]:
+            del _secrets[key]
@@ -1,66 +1,88 @@
 
-import tkinter as tk
-import os
-from tkinter import ttk, messagebox
-from configparser import ConfigParser
-from encryption_utils import (encrypt_secret,decrypt_secret)
+from encryption_utils import (encrypt_secret,wait_for_key)
 from log_utils import log_message
+from session_utils import close_sessions
+import listing_cache
+import par_cache
+import token_store
+import config_store
 import state
 
+RESERVED_SECTIONS = ("encryption", "settings")
+
+def customer_sections(cfg):
+    """Section names that describe customers, i.e. everything but the app's own sections."""
+    return [s for s in cfg.sections() if s not in RESERVED_SECTIONS]
+
 def load_config():
-    state.config = ConfigParser()
-    state.config.read(state.CONFIG_FILE)
+    """Point state.config at the current config.ini; it is re-parsed only when the file changed."""
+    state.config = config_store.get()
+
+def apply_customer_config(customer):
+    """
+    Load a customer section from config.ini into state without touching any widget.
+    Returns None on success or the error message describing what is missing.
+    """
+    load_config()
+    if customer not in state.config or customer in RESERVED_SECTIONS:
+        return "Selected customer not found in config."
+
+    state.selected_customer = customer
+    state.customer_config = {key: value for key, value in state.config[customer].items()}
+    log_message(f"Customer '{customer}' selected. Credentials updated.")
+
+    state.fts_host_name = state.customer_config.get("fts_host_name")
+    state.oci_iam_base_url = state.customer_config.get("oci_iam_base_url")
+    state.oci_iam_scope = state.customer_config.get("oci_iam_scope")
+    state.client_id = state.customer_config.get("client_id")
+    state.client_secret = state.customer_config.get("client_secret")
+
+    if state.client_secret:
+        state.client_secret = config_store.secret(customer, state.client_secret)
+
+    if not state.fts_host_name:
+        return "FTS_HOST_NAME is missing in the configuration."
+
+    if not state.oci_iam_base_url:
+        return "OCI_IAM_BASE_URL is missing in the configuration."
+
+    if not state.oci_iam_scope:
+        return "OCI_IAM_SCOPE is missing in the configuration."
+
+    if not state.client_id:
+        return "CLIENT_ID is missing in the configuration."
+
+    if not state.client_secret:
+        return "CLIENT_SECRET is missing in the configuration."
+
+    return None
 
 def set_customer_config(event=None):
 
-    load_config()
-    state.selected_customer = state.customer_dropdown.get()
-    if state.selected_customer in state.config:
-        state.customer_config = {key: value for key, value in state.config[state.selected_customer].items()}
-        log_message(f"Customer '{state.selected_customer}' selected. Credentials updated.")
-
-        state.fts_host_name = state.customer_config.get("fts_host_name")
-        state.oci_iam_base_url = state.customer_config.get("oci_iam_base_url")
-        state.oci_iam_scope = state.customer_config.get("oci_iam_scope")
-        state.client_id = state.customer_config.get("client_id")
-        state.client_secret = state.customer_config.get("client_secret")
-
-        if state.client_secret:
-            state.client_secret = decrypt_secret(state.client_secret)
-
-        if not state.fts_host_name:
-            log_message("ERROR! - FTS_HOST_NAME is missing in the configuration.")
-            return
-
-        if not state.oci_iam_base_url:
-            log_message("ERROR! - OCI_IAM_BASE_URL is missing in the configuration.")
-            return
-
-        if not state.oci_iam_scope:
-            log_message("ERROR! - OCI_IAM_SCOPE is missing in the configuration.")
-            return
-
-        if not state.client_id:
-            log_message("ERROR! - CLIENT_ID is missing in the configuration.")
-            return
-
-        if not state.client_secret:
-            log_message("ERROR! - CLIENT_SECRET is missing in the configuration.")
-            return
-
-        state.prefix_dropdown.set('')
-        state.prefix_dropdown['values'] = ()
-
-        log_message(f"FTS_HOST_NAME {state.fts_host_name}")
-        log_message(f"OCI IAM Base URL: {state.oci_iam_base_url}")
-        log_message(f"OCI IAM Scope: {state.oci_iam_scope}")
-        log_message(f"Client ID: {state.client_id}")
-        log_message(f"Client Secret: {state.client_secret}")
-    else:
-        log_message("Error: Selected customer not found in config.")
+    # the key is derived in the background at startup; it is normally ready long before this
+    if not wait_for_key():
+        return
+
+    error = apply_customer_config(state.customer_dropdown.get())
+    if error:
+        log_message(f"ERROR! - {error}")
+        return
+
+    state.prefix_dropdown.set('')
+    state.prefix_dropdown['values'] = ()
+    state.listing_generation += 1  # late batches of the previous customer's listing are dropped
+
+    log_message(f"FTS_HOST_NAME {state.fts_host_name}")
+    log_message(f"OCI IAM Base URL: {state.oci_iam_base_url}")
+    log_message(f"OCI IAM Scope: {state.oci_iam_scope}")
+    log_message(f"Client ID: {state.client_id}")
+    log_message(f"Client Secret: {state.client_secret}")
 
 def add_customer_keys(root):
+    import tkinter as tk
+    from tkinter import ttk, messagebox
 
+    wait_for_key()
     top = tk.Toplevel(root)  #
     top.title("Manage Customer Config")
     top.geometry("550x250")
@@ -72,36 +94,18 @@ def add_customer_keys(root):
     labels = ["FTS Host Name", "OCI IAM Base URL", "OCI IAM Scope", "Client ID", "Client Secret"]
     entries = {}
 
-    config_file = state.CONFIG_FILE
-
     def fetch_config(include_encryption=False):
-        cfg = ConfigParser()
-        if os.path.exists(config_file):
-           cfg.read(config_file)
-           if not include_encryption and "encryption" in cfg:
-              cfg.remove_section("encryption")
-        return cfg
+        return config_store.copy(include_encryption)
 
     def save_config(cfg):
-        if os.path.exists(config_file):
-
-            existing_cfg = ConfigParser()
-            existing_cfg.read(config_file)
-
-            for section in existing_cfg.sections():
-                if  cfg.has_section(section):
-                    existing_cfg.remove_section(section)
-
-                for section in cfg.sections():
-                   if not existing_cfg.has_section(section):
-                          existing_cfg.add_section(section)
-                   for key, value in cfg.items(section):
-                       existing_cfg.set(section, key, value)
-        else:
-            existing_cfg = cfg
-
-        with open(config_file, 'w') as f:
-            existing_cfg.write(f)
+        existing_cfg = config_store.copy()
+        for section in cfg.sections():
+            if existing_cfg.has_section(section):
+                existing_cfg.remove_section(section)
+            existing_cfg.add_section(section)
+            for key, value in cfg.items(section):
+                existing_cfg.set(section, key, value)
+        config_store.write(existing_cfg)
 
 
     def clear_entries():
@@ -112,12 +116,12 @@ def add_customer_keys(root):
 
     def load_env_data(event=None):
         env = env_var.get()
-        cfg = fetch_config()
-        if cfg.has_section(env):
+        cfg = config_store.get()
+        if cfg.has_section(env) and env != "encryption":
             for key in keys:
                 val = cfg.get(env, key, fallback="")
                 if key == "CLIENT_SECRET":
-                    val = decrypt_secret(val)
+                    val = config_store.secret(env, val)
                 entries[key].delete(0, tk.END)
                 entries[key].insert(0, val)
         else:
@@ -175,13 +179,16 @@ def add_customer_keys(root):
             state.prefix_dropdown['values'] = ()
 
         env = env_var.get()
+        close_sessions(env)
+        token_store.forget(env)
+        listing_cache.invalidate(customer=env)
+        par_cache.clear(env)
+        config_store.forget_secrets(env)
         cfg = fetch_config(True)
 
         if cfg.has_section(env):
             cfg.remove_section(env)
-            #save_config(cfg)
-            with open(config_file, 'w') as f:
-                cfg.write(f)
+            config_store.write(cfg)
             refresh_env_list()
             env_var.set("")
             clear_entries()
@@ -190,9 +197,9 @@ def add_customer_keys(root):
             show_popup_msg(top, "Warning", "Not Found", f"No environment named [{env}]")
 
     def refresh_env_list():
-        cfg = fetch_config()
-        env_dropdown['values'] = cfg.sections()
-        state.customer_dropdown['values'] = cfg.sections()
+        cfg = config_store.get()
+        env_dropdown['values'] = customer_sections(cfg)
+        state.customer_dropdown['values'] = customer_sections(cfg)
 
     tk.Label(top, text="Environment").grid(row=0, column=0, padx=5, pady=5, sticky='e')
     env_var = tk.StringVar()
@@ -2,23 +2,20 @@
 import os
 import sys
 import base64
-import configparser
-import tkinter as tk
-from tkinter import messagebox
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.backends import default_backend
+import threading
 import state
 import string,random
 
-config = configparser.ConfigParser()
+_key_ready = threading.Event()   # set once unlock_encryption has finished, whatever the outcome
+_unlocked = False                # its result
 
 def generate_random_string(length=10):
     characters = string.ascii_letters + string.digits
     return ''.join(random.choice(characters) for _ in range(length))
 
 def get_encryption_password(root):
+    import tkinter as tk
+
     result = None
 
     def on_submit():
@@ -30,6 +27,7 @@ def get_encryption_password(root):
     dialog.title("Encryption Login")
     dialog.geometry("350x120")
     dialog.resizable(False, False)
+    dialog.transient(root)
     dialog.grab_set()
 
     tk.Label(dialog, text="Enter encryption password:").pack(pady=(15, 5))
@@ -42,27 +40,69 @@ def get_encryption_password(root):
     return result
 
 def initialize_encryption(root):
+    """
+    Ask for the encryption password over the main window and derive the key on a worker
+    thread, so the window stays responsive; wait_for_key() blocks until it is ready.
+    """
+    from tkinter import messagebox
+    import ui_events
+
+    password_input = get_encryption_password(root)
+    if not password_input:
+        messagebox.showerror("Login Failed", "Password is required to continue.")
+        sys.exit(1)
 
-    if not os.path.exists(state.CONFIG_FILE):
-        with open(state.CONFIG_FILE, "w") as f:
-            pass
+    def check(unlocked):
+        if not unlocked:
+            messagebox.showerror("Wrong Encryption Key", "Please enter the correct encryption key to continue")
+            sys.exit(1)
 
-    config.read(state.CONFIG_FILE)
-    root.withdraw()
+    def derive():
+        try:
+            unlocked = unlock_encryption(password_input)
+        except Exception:
+            unlocked = False
+        ui_events.post(check, unlocked)
+
+    threading.Thread(target=derive, name="unlock-encryption", daemon=True).start()
+
+def wait_for_key():
+    """Block until unlock_encryption has run; returns True when the password was right."""
+    _key_ready.wait()
+    return _unlocked
+
+def unlock_encryption(password_input):
+    """
+    Derive state.fernet from the encryption password without any UI, creating the salt
+    and key check on first use. Returns False when the password does not match the key check.
+    """
+    global _unlocked
+    try:
+        _unlocked = _unlock(password_input)
+        return _unlocked
+    finally:
+        _key_ready.set()
+
+def _unlock(password_input):
+    # cryptography is imported here, off the startup path
+    from cryptography.fernet import Fernet
+    from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.backends import default_backend
+    import config_store
+
+    config = config_store.copy()
+    changed = False
 
     if "encryption" not in config or "salt" not in config["encryption"]:
-        config.add_section("encryption")
+        if "encryption" not in config:
+            config.add_section("encryption")
         salt_bytes = os.urandom(16)
         encoded_salt = base64.b64encode(salt_bytes).decode("utf-8")
         config.set("encryption", "salt", encoded_salt)
+        changed = True
 
     salt = base64.b64decode(config["encryption"]["salt"])
-
-    password_input = get_encryption_password(root)
-    if not password_input:
-        messagebox.showerror("Login Failed", "Password is required to continue.")
-        sys.exit(1)
-
     password = password_input.encode()
 
     kdf = PBKDF2HMAC(
@@ -73,19 +113,26 @@ def initialize_encryption(root):
         backend=default_backend()
     )
     key = base64.urlsafe_b64encode(kdf.derive(password))
-    state.fernet = Fernet(key)
+    # kept local until the key check passes, so a wrong password never becomes state.fernet
+    fernet = Fernet(key)
 
     if "key_check" not in config["encryption"]:
-        enc_key_test_str=encrypt_secret(generate_random_string())
+        enc_key_test_str = fernet.encrypt(generate_random_string().encode()).decode()
         config.set("encryption", "key_check", enc_key_test_str)
+        changed = True
 
-    with open(state.CONFIG_FILE, "w") as configfile:
-        config.write(configfile)
+    try:
+        fernet.decrypt(config["encryption"]["key_check"].encode())
+    except Exception:
+        return False
 
-    if "key_check" in config["encryption"]:
-        if decrypt_secret(config["encryption"]["key_check"]) == "[Decryption Failed]":
-            messagebox.showerror("Wrong Encryption Key", "Please enter the correct encryption key to continue")
-            sys.exit(1)
+    # only a new salt or key check is written; an unchanged config.ini is left alone
+    if changed or not os.path.exists(state.CONFIG_FILE):
+        config_store.write(config)
+
+    state.fernet = fernet
+    config_store.forget_secrets()
+    return True
 
 def encrypt_secret(secret):
 
@@ -95,7 +142,6 @@ def encrypt_secret(secret):
         return "[Encryption Failed]"
 
 def decrypt_secret(encrypted_secret):
-    global fernet
     try:
         return state.fernet.decrypt(encrypted_secret.encode()).decode()
     except Exception:
@@ -2,13 +2,37 @@ import os
 import state
 import threading
 import requests
-import json
 import tkinter as tk
-import concurrent.futures
 from tkinter import filedialog, messagebox,ttk
-from ui_utils import apply_filter
-from api import get_access_token
+from ui_utils import refresh_filter, append_rows, finish_rows
 from log_utils import log_message
+from transfer_journal import UploadJournal
+import listing_cache
+import ui_events
+import startup_timing
+from api import customer_snapshot
+from transfer_service import (
+    TransferError, refresh_prefixes, stream_files, upload_batch, download_batch, delete_batch, move_batch,
+    apply_rename_template
+)
+
+def _show_summary(title, verb, results, success_message):
+    """Report a batch per file: success_message when every file succeeded, else counts and failed names."""
+    failed = [os.path.basename(name) for name, ok in results.items() if not ok]
+    if not failed:
+        log_message(f"Success - {success_message}")
+        ui_events.post(messagebox.showinfo, title, success_message)
+        return
+
+    log_message(f"ERROR! - {len(failed)} of {len(results)} file(s) could not be {verb}: {', '.join(failed)}")
+    shown = "\n".join(failed[:20]) + (f"\n... and {len(failed) - 20} more" if len(failed) > 20 else "")
+    ui_events.post(messagebox.showwarning, title,
+                   f"{len(results) - len(failed)} of {len(results)} files {verb}.\nFailed (see log):\n{shown}")
+
+
+class _Superseded(Exception):
+    """Raised inside a listing worker once a newer listing has started."""
+
 
 def list_prefixes():
 
@@ -17,39 +41,39 @@ def list_prefixes():
         return
 
     log_message(f"Using fts_host_name in list_prefixes: {state.fts_host_name}")
+    customer = customer_snapshot()  # the worker caches and shows its answer for this customer only
 
-    access_token = get_access_token()
-    if not access_token:
-        return
-
-    log_message("Fetching prefixes...")
-    url = f"{state.fts_host_name}/listprefixes"
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Accept": "application/json",
-        "Accept-Language": "en-US",
-    }
-
-    try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        response_data = response.json()
-
-        if isinstance(response_data, list):
-
-            sorted_data = sorted(response_data, key=str.lower)
-            state.prefix_dropdown["values"] = sorted_data
+    def show_prefixes(sorted_data):
+        if (state.selected_customer or "default") != customer.key:
+            return  # the customer was switched while the prefixes loaded
+        state.prefix_dropdown["values"] = sorted_data
+        if sorted_data:
             state.prefix_dropdown.current(0)
-            log_message(f"Prefixes loaded (sorted): {sorted_data}")
+        startup_timing.mark("first listing")
+        log_message(f"Prefixes loaded (sorted): {sorted_data}")
 
-        else:
+    cached = listing_cache.get(listing_cache.PREFIXES, customer=customer.key)
+    if cached:
+        show_prefixes(cached.rows)
+        if cached.is_fresh():
+            return
+        log_message(f"Cached prefixes are {cached.age():.0f}s old, revalidating...")
+    else:
+        log_message("Fetching prefixes...")
 
-            log_message("ERROR! - Unexpected API response format.")
-            messagebox.showerror("ERROR", "Unexpected API response format.")
+    def run_listing():
+        try:
+            entry = refresh_prefixes(cached, customer)
+            if entry is not cached:
+                ui_events.post(show_prefixes, entry.rows)
+        except TransferError as e:
+            log_message(f"ERROR! - {e}")
+            ui_events.post(messagebox.showerror, "ERROR", str(e))
+        except requests.exceptions.RequestException as e:
+            log_message(f"ERROR! - Failed to fetch prefixes - {e}")
+            ui_events.post(messagebox.showerror, "ERROR!", f"Failed to fetch prefixes: {e}")
 
-    except requests.exceptions.RequestException as e:
-        log_message(f"ERROR! - Failed to fetch prefixes - {e}")
-        messagebox.showerror("ERROR!", f"Failed to fetch prefixes: {e}")
+    threading.Thread(target=run_listing, daemon=True).start()
 
 
 def list_files():
@@ -61,48 +85,67 @@ def list_files():
 
     log_message(f"Using fts_host_name in list_files: {state.fts_host_name}")
 
-    access_token = get_access_token()
-    if not access_token:
-        return
+    state.listing_generation += 1
+    generation = state.listing_generation
+    customer = customer_snapshot()
+
+    # a cached listing is shown at once; a missing one streams in batch by batch
+    cached = listing_cache.get(listing_cache.FILES, selected_prefix, customer=customer.key)
+    state.file_data = list(cached.rows) if cached else []
+    refresh_filter()
+    if cached:
+        startup_timing.mark("first listing")
+        if cached.is_fresh():
+            log_message(f"Files loaded from cache: {len(cached.rows)} items ({cached.age():.0f}s old).")
+            return
+        log_message(f"Showing cached listing of {selected_prefix} ({cached.age():.0f}s old), revalidating...")
+    else:
+        log_message(f"Fetching files for prefix: {selected_prefix}...")
+
+    def show_batches(batches):
+        if generation == state.listing_generation:
+            append_rows([file for batch in batches for file in batch])
+            startup_timing.mark("first listing")
+
+    def on_batch(batch):
+        if generation != state.listing_generation:
+            raise _Superseded()
+        # batches arriving within one frame reach the grid as a single update
+        ui_events.post_batch(("listing", generation), show_batches, batch)
+
+    def show_complete():
+        if generation == state.listing_generation:
+            finish_rows()
+
+    def show_revalidated(rows):
+        if generation == state.listing_generation:
+            state.file_data = list(rows)
+            refresh_filter()
+
+    def run_listing():
+        try:
+            entry = stream_files(selected_prefix, on_batch=None if cached else on_batch, entry=cached,
+                                 customer=customer)
+            if entry is cached:
+                log_message(f"Listing of {selected_prefix} unchanged: {len(entry.rows)} items.")
+                return
+            if cached:
+                ui_events.post(show_revalidated, entry.rows)
+            log_message(f"Files loaded: {len(entry.rows)} items found.")
+        except _Superseded:
+            log_message(f"Listing of {selected_prefix} superseded by a newer one.")
+        except TransferError as e:
+            log_message(f"ERROR! - {e}")
+            ui_events.post(messagebox.showerror, "ERROR!", str(e))
+        except requests.exceptions.RequestException as e:
+            log_message(f"ERROR! - Failed to fetch files - {e}")
+            ui_events.post(messagebox.showerror, "ERROR!", f"Failed to fetch files: {e}")
+        finally:
+            if not cached:
+                # posted after the last batch, so it runs once every streamed row is in the grid
+                ui_events.post(show_complete)
 
-    log_message(f"Fetching files for prefix: {selected_prefix}...")
-    url = f"{state.fts_host_name}/listfiles?prefix={selected_prefix}"
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Accept": "application/json",
-        "Accept-Language": "en-US",
-    }
-
-    try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        response_data = response.json()
-
-        state.file_tree.delete(*state.file_tree.get_children())
-
-        if "resultSet" in response_data and isinstance(response_data["resultSet"], list):
-
-            state.file_data = response_data["resultSet"]
-            for file in state.file_data:
-                state.file_tree.insert(
-                    "",
-                    "end",
-                    values=(
-                        file.get("name", "N/A"),
-                        file.get("size", 0),
-                        file.get("createdDate", "N/A"),
-                        file.get("modifiedDate", "N/A"),
-                        file.get("scanStatus", "N/A"),
-                    ),
-                )
-            log_message(f"Files loaded: {len(state.file_data)} items found.")
-            apply_filter()
-        else:
-            log_message("ERROR! - Unexpected API response format.")
-            messagebox.showerror("ERROR!", "Unexpected API response format.")
-    except requests.exceptions.RequestException as e:
-        log_message(f"ERROR! - Failed to fetch files - {e}")
-        messagebox.showerror("ERROR!", f"Failed to fetch files: {e}")
+    threading.Thread(target=run_listing, daemon=True).start()
 
 
 def upload_files():
@@ -116,103 +159,57 @@ def upload_files():
         messagebox.showerror("ERROR!", "No storage prefix selected.")
         return
 
-    access_token = get_access_token()
-    if not access_token:
+    journal = UploadJournal(state.selected_customer, storage_prefix)
+    journal.start_batch(selected_files)
+    start_upload(selected_files, storage_prefix, journal)
+
+
+def resume_upload():
+    storage_prefix = state.prefix_dropdown.get()
+    if not storage_prefix:
+        messagebox.showerror("ERROR!", "No storage prefix selected.")
         return
 
-    api_url = f"{state.fts_host_name}/upload"
-
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Accept": "application/json",
-        "Accept-Language": "en-US",
-        "Content-Type": "application/json",
-    }
-
-    payload = {
-        "listOfFiles": [
-            {
-                "storagePrefix": storage_prefix,
-                "fileName": os.path.basename(file_path)
-            }
-            for file_path in selected_files
-        ]
-    }
-
-    log_message(f"Target prefix: {storage_prefix}")
-    log_message(f"API Used: {api_url}")
-    log_message(f"Upload Request: {payload}")
+    journal = UploadJournal.load(state.selected_customer, storage_prefix)
+    if not journal:
+        messagebox.showinfo("Resume Upload", f"No interrupted upload batch found for '{storage_prefix}'.")
+        return
 
-    def upload_worker():
+    pending_files = journal.pending_files()
+    counts = journal.counts()
+    if not pending_files:
+        journal.remove()
+        messagebox.showinfo("Resume Upload", "The last upload batch has already completed.")
+        return
 
-        try:
-            response = requests.post(api_url, headers=headers, json=payload)
-            response.raise_for_status()
-            response_data = response.json()
+    log_message(f"Resuming upload batch for {storage_prefix}: {counts['done']} done, "
+                f"{len(pending_files)} remaining.")
+    start_upload(pending_files, storage_prefix, journal)
 
-            if len(response_data.get("parList", [])) != len(selected_files):
-                log_message("Number of files in the response does not match the number of selected files.")
-                return
 
-            def upload_file(file_path, access_uri):
-                """Function to upload a single file"""
-                file_name = os.path.basename(file_path)
-                try:
-                    if os.path.getsize(
-                            file_path) == 0:
-                        put_response = requests.put(access_uri, data=b'', headers={"Content-Length": "0"})
-                    else:
-                        with open(file_path, "rb") as file:
-                            put_response = requests.put(access_uri, data=file)
-
-                    if put_response.status_code == 200:
-                        log_message(f"✅ File {file_name} uploaded successfully.")
-                    else:
-                        log_message(f"Failed to upload {file_name}. Error: {put_response.text}")
-                except Exception as e:
-                    log_message(f"ERROR! - uploading file {file_name}: {str(e)}")
-
-            with concurrent.futures.ThreadPoolExecutor(max_workers=state.MAX_THREADS) as executor:
-                futures = []
-                for file_path in selected_files:
-                    file_name = os.path.basename(file_path)
-                    matching_entry = next(
-                        (file_data for file_data in response_data["parList"] if file_data["name"] == file_name), None)
-
-                    if not matching_entry:
-                        log_message(f"No matching entry found for {file_name} in the response.")
-                        continue
-
-                    access_uri = matching_entry.get("accessUri")
-                    if not access_uri:
-                        log_message(f"ERROR! - Failed to get accessUri for {file_name}")
-                        continue
-
-                    future = executor.submit(upload_file, file_path, access_uri)
-                    futures.append(future)
-
-                concurrent.futures.wait(futures)
-
-            messagebox.showinfo("Success", "All files uploaded successfully.")
+def start_upload(selected_files, storage_prefix, journal):
+    customer = customer_snapshot()  # taken now, so switching customers cannot redirect the upload
 
-        except requests.exceptions.RequestException as e:
+    def upload_worker():
+
+        try:
+            results = upload_batch(selected_files, storage_prefix, journal, customer)
+            _show_summary("Upload Completed", "uploaded", results, "All files uploaded successfully.")
+
+        except (TransferError, requests.exceptions.RequestException) as e:
             log_message(f"ERROR! - uploading files: {e}")
-            messagebox.showerror("Upload Error", f"Error uploading files: {e}")
+            ui_events.post(messagebox.showerror, "Upload Error", f"Error uploading files: {e}")
 
     threading.Thread(target=upload_worker, daemon=True).start()
 
 
 def download_files():
-    selected_items = state.file_tree.selection()
-    if not selected_items:
+    selected_rows = state.file_grid.selected_rows()
+    if not selected_rows:
         messagebox.showerror("ERROR!", "Please select at least one file to download.")
         return
 
-    selected_files = []
-    for item in selected_items:
-        file_details = state.file_tree.item(item, "values")
-        if file_details:
-            selected_files.append(file_details[0])
+    selected_files = [file.get("name") for file in selected_rows]
 
     prefix_name = state.prefix_dropdown.get()
     if not prefix_name:
@@ -223,72 +220,35 @@ def download_files():
     if not save_directory:
         return
 
-    access_token = get_access_token()
-    if not access_token:
-        return
-
-    url = f"{state.fts_host_name}/download"
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Accept": "application/json",
-        "Accept-Language": "en-US",
-        "Content-Type": "application/json",
-    }
-
-    payload = {
-        "listOfFiles": [{"storagePrefix": prefix_name, "fileName": os.path.basename(file_name)} for file_name in
-                        selected_files]
-    }
-
-    log_message(f"Selected Prefix: {prefix_name}")
-    log_message(f"API Endpoint: {url}")
-
-    def download_worker(file_info):
-
-        file_name = file_info.get("name")
-        access_uri = file_info.get("accessUri")
-
-        if not access_uri:
-            log_message(f"No access URI for {file_name}, skipping download.")
-            return
-
-        try:
-            file_response = requests.get(access_uri, stream=True)
-            file_response.raise_for_status()
-
-            file_path = os.path.join(save_directory, file_name)
-            with open(file_path, "wb") as file:
-                for chunk in file_response.iter_content(chunk_size=8192):
-                    file.write(chunk)
-
-            log_message(f"✅ {file_name} downloaded successfully.")
-        except requests.exceptions.RequestException as e:
-            log_message(f"ERROR! - Failed to download {file_name}: {e}")
+    listing = {os.path.basename(f.get("name", "")): f for f in state.file_data}
+    customer = customer_snapshot()
 
     def process_download():
 
         try:
-            response = requests.post(url, headers=headers, json=payload)
-            response.raise_for_status()
-            response_data = response.json()
-
-            if "parList" in response_data and response_data["parList"]:
-
-                with concurrent.futures.ThreadPoolExecutor(max_workers=state.MAX_THREADS) as executor:
-                    executor.map(download_worker, response_data["parList"])
-
-                messagebox.showinfo("Success", f"Files downloaded successfully to:\n{save_directory}")
-                log_message(f"All files downloaded successfully to: {save_directory}")
-            else:
-                log_message(f"Unexpected API response format: {response_data}")
-                messagebox.showerror("ERROR!", f"Unexpected API response format\n{response_data}")
+            results = download_batch(selected_files, prefix_name, save_directory, listing, customer)
+            _show_summary("Download Completed", "downloaded", results,
+                          f"Files downloaded successfully to:\n{save_directory}")
 
+        except TransferError as e:
+            log_message(f"ERROR! - {e}")
+            ui_events.post(messagebox.showerror, "ERROR!", str(e))
         except requests.exceptions.RequestException as e:
             log_message(f"ERROR! - {e}")
-            messagebox.showerror("ERROR!", f"Failed to download files: {e}")
+            ui_events.post(messagebox.showerror, "ERROR!", f"Failed to download files: {e}")
 
     threading.Thread(target=process_download, daemon=True).start()
 
+def _remove_rows(names):
+    """Drop rows (exact listing names) from the grid and file_data; False when none was listed."""
+    state.file_grid.remove_names(names)  # rows hidden by the filter are only in file_data
+    kept = [f for f in state.file_data if f.get("name", "") not in names]
+    if len(kept) == len(state.file_data):
+        return False
+    state.file_data = kept
+    return True
+
+
 def delete_selected_files():
     parent = state.file_tree.winfo_toplevel()
     def custom_confirm_deletion(title, file_list, prefix_name):
@@ -331,8 +291,8 @@ def delete_selected_files():
         win.wait_window()
         return result["value"]
 
-    selected_items = state.file_tree.selection()
-    if not selected_items:
+    selected_rows = state.file_grid.selected_rows()
+    if not selected_rows:
         messagebox.showwarning("Warning", "Please select one or more files to delete!")
         return
 
@@ -341,74 +301,37 @@ def delete_selected_files():
         messagebox.showerror("ERROR!", "No prefix selected.")
         return
 
-    files_to_delete = []
-    for item in selected_items:
-        values = state.file_tree.item(item)['values']
-        if values:
-            file_name =  values[0].split("/")[-1]
-            files_to_delete.append({
-                "tree_item": item,
-                "storagePrefix": prefix_name,
-                "fileName": file_name
-            })
-
-    file_names = [f["fileName"] for f in files_to_delete]
+    file_names = [file.get("name", "").split("/")[-1] for file in selected_rows]
 
     confirm = custom_confirm_deletion("Confirm Deletion", file_names, prefix_name)
 
     if not confirm:
         return
 
-    access_token = get_access_token()
-    if not access_token:
-        log_message("ERROR! - Failed to retrieve access token.")
-        return
-
-    api_url = f"{state.fts_host_name}/delete"
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json",
-        "Accept-Language": "en-US"
-    }
-
-    def delete_tree_item_by_filename(filename: str):
+    # the API takes bare file names; the grid is keyed by the exact listing name
+    row_names = {file.get("name", "").split("/")[-1]: file.get("name", "") for file in selected_rows}
 
-        for item in state.file_tree.get_children():
-            values = state.file_tree.item(item, "values")
-            if values and filename in values[0]:
-                state.file_tree.delete(item)
-                return
-        log_message(f"⚠️ Could not find item to delete in grid: {filename}")
+    def delete_tree_items_by_filename(filenames):
 
-    def delete_worker(file_info):
+        names = {row_names[filename] for filename in filenames}
+        if not _remove_rows(names):
+            log_message(f"⚠️ Could not find item to delete in grid: {', '.join(sorted(names))}")
 
-        file_name = file_info["fileName"]
-        storagePrefix = file_info["storagePrefix"]
+    def on_deleted(file_name):
+        # every deletion finished within one frame is removed from the grid in one pass
+        ui_events.post_batch("deleted", delete_tree_items_by_filename, file_name)
 
-        payload = {
-            "listOfFiles": [
-                {
-                    "storagePrefix": storagePrefix,
-                    "fileName": file_name
-                }
-            ]
-        }
-
-        try:
-            response = requests.delete(api_url, headers=headers, data=json.dumps(payload))
-            if response.status_code == 200:
-                log_message(f"✅ File '{file_name}' deleted successfully from '{storagePrefix}'")
-                parent.after(0, lambda: delete_tree_item_by_filename(file_name))
-            else:
-                log_message(f"❌ Failed to delete '{file_name}': {response.text}")
-        except requests.exceptions.RequestException as e:
-            log_message(f"❌ Request error deleting '{file_name}': {e}")
+    customer = customer_snapshot()  # taken now, so switching customers cannot redirect the deletion
 
     def run_deletion():
-        with concurrent.futures.ThreadPoolExecutor(max_workers=state.MAX_THREADS) as executor:
-            executor.map(delete_worker, files_to_delete)
+        try:
+            results = delete_batch(file_names, prefix_name, on_deleted, customer)
+        except (TransferError, requests.exceptions.RequestException) as e:
+            log_message(f"ERROR! - {e}")
+            ui_events.post(messagebox.showerror, "ERROR!", f"Failed to delete files: {e}")
+            return
 
-        messagebox.showinfo("Deletion Completed", "Selected files processed for deletion.")
+        _show_summary("Deletion Completed", "deleted", results, f"{len(results)} file(s) deleted from '{prefix_name}'.")
 
     threading.Thread(target=run_deletion, daemon=True).start()
 
@@ -419,98 +342,97 @@ def move_file():
         messagebox.showerror("Error", "No storage prefix selected.")
         return
 
-    selected_file = get_selected_file()
-
-    if not selected_file:
+    # the selection, or with nothing selected every row the filter currently shows
+    selected_rows = state.file_grid.selected_rows()
+    scope_rows = selected_rows or list(state.file_grid.rows)
+    if not scope_rows:
+        messagebox.showerror("ERROR!", "Please select the file to move.")
         return
 
+    row_names = {file.get("name", "").split("/")[-1]: file.get("name", "") for file in scope_rows}
+    file_names = list(row_names)
+    single = len(file_names) == 1
+    # taken with the rows, so switching customers while the dialog is open cannot redirect the move
+    customer = customer_snapshot()
+
     def open_move_popup():
 
         move_popup = tk.Toplevel()
-        move_popup.title("Move File")
+        move_popup.title("Move File" if single else "Move Files")
 
-        tk.Label(move_popup, text=f"Move File: {selected_file}").grid(row=0, column=0, padx=10, pady=5)
+        if single:
+            title = f"Move File: {file_names[0]}"
+        elif selected_rows:
+            title = f"Move {len(file_names)} selected files"
+        else:
+            title = f"Move all {len(file_names)} files shown in the grid"
+        tk.Label(move_popup, text=title).grid(row=0, column=0, padx=10, pady=5)
         tk.Label(move_popup, text="Select Target Prefix:").grid(row=1, column=0, padx=10, pady=5)
 
         new_prefix_dropdown = ttk.Combobox(move_popup, values=get_available_prefixes(), state="readonly", width=30)
         new_prefix_dropdown.grid(row=1, column=1, padx=10, pady=5)
 
-        tk.Label(move_popup, text="Enter New File Name:").grid(row=2, column=0, padx=10, pady=5)
+        tk.Label(move_popup, text="Enter New File Name:" if single else "Rename Template (optional):").grid(
+            row=2, column=0, padx=10, pady=5)
 
         new_filename_entry = tk.Entry(move_popup, width=32)
-        new_filename_entry.insert(0, selected_file)
+        if single:
+            new_filename_entry.insert(0, file_names[0])
         new_filename_entry.grid(row=2, column=1, padx=50, pady=5)
 
+        if not single:
+            tk.Label(move_popup, text="e.g. {stem}_{date}{ext}   placeholders: {name} {stem} {ext} {n} {date}").grid(
+                row=3, column=0, columnspan=2, padx=10)
+
         def move_action():
 
             new_prefix = new_prefix_dropdown.get()
-            new_filename = new_filename_entry.get()
+            new_filename = new_filename_entry.get().strip()
 
             if new_prefix == current_prefix:
                 messagebox.showerror("Error",
                                      "Target prefix cannot be the current one, please select a different prefix")
                 return
 
-            if not new_prefix or not new_filename:
+            if not new_prefix or (single and not new_filename):
                 messagebox.showerror("Error",
                                      "Please select a new prefix and enter a new file name [new file_name is optional].")
                 return
 
-            payload = {
-                "listOfFiles": [
-                    {
-                        "currentPath": {
-                            "storagePrefix": current_prefix,
-                            "fileName": selected_file
-                        },
-                        "newPath": {
-                            "storagePrefix": new_prefix,
-                            "fileName": new_filename
-                        }
-                    }
-                ]
-            }
-
-            try:
-
-                api_url = f"{state.fts_host_name}/movefiles"
-                headers = {
-                    "Authorization": f"Bearer {get_access_token()}",
-                    "Content-Type": "application/json",
-                    "Accept-Language": "en-US"
-                }
-
-                log_message(f"API used for file move : {api_url}")
-                response = requests.post(api_url, json=payload, headers=headers)
-                response.raise_for_status()
-
-                log_message(f"Success {selected_file} successfully moved to {new_prefix}/{new_filename}")
-                messagebox.showinfo("Success",
-                                    f"File {selected_file} successfully moved to {new_prefix}/{new_filename}")
-                move_popup.destroy()
-
-            except requests.exceptions.RequestException as e:
-                log_message(f"Failed to move file {selected_file} {str(e)}")
-                messagebox.showerror("ERROR!", f"Failed to move file: {e}")
-                move_popup.destroy()
-
-        move_button = tk.Button(move_popup, text="Move File", command=move_action)
-        move_button.grid(row=3, column=0, columnspan=2, padx=10, pady=10)
+            if not selected_rows and not single and not messagebox.askyesno(
+                    "Confirm Move", f"Move all {len(file_names)} files shown in the grid to '{new_prefix}'?",
+                    parent=move_popup):
+                return
 
-    open_move_popup()
+            new_names = [new_filename] if single else apply_rename_template(new_filename, file_names)
+            moves = [(name, new_prefix, new_name) for name, new_name in zip(file_names, new_names)]
+            move_popup.destroy()
+            log_message(f"Moving {len(moves)} file(s) from {current_prefix} to {new_prefix}...")
+            threading.Thread(target=run_move, args=(new_prefix, moves), daemon=True).start()
 
+        move_button = tk.Button(move_popup, text="Move File" if single else "Move Files", command=move_action)
+        move_button.grid(row=4, column=0, columnspan=2, padx=10, pady=10)
 
-def get_available_prefixes():
-    return state.prefix_dropdown["values"]
+    def on_moved(file_name):
+        ui_events.post_batch("moved", lambda names: _remove_rows({row_names[name] for name in names}), file_name)
 
+    def run_move(new_prefix, moves):
+        try:
+            results = move_batch(current_prefix, moves, on_moved, customer)
+        except (TransferError, requests.exceptions.RequestException) as e:
+            log_message(f"Failed to move file(s) {str(e)}")
+            ui_events.post(messagebox.showerror, "ERROR!", f"Failed to move file: {e}")
+            return
 
-def get_selected_file():
-    selected_items = state.file_tree.selection()
-    if not selected_items:
-        messagebox.showerror("ERROR!", "Please select the file to move.")
-        return
-    for item in selected_items:
-        file_details = state.file_tree.item(item, "values")
-        file_name = file_details[0]
+        if single:
+            file_name, _, new_name = moves[0]
+            message = f"File {file_name} successfully moved to {new_prefix}/{new_name}"
+        else:
+            message = f"{len(moves)} files successfully moved to {new_prefix}"
+        _show_summary("Move Completed", f"moved to {new_prefix}", results, message)
 
-    return os.path.basename(file_name)
\ No newline at end of file
+    open_move_popup()
+
+
+def get_available_prefixes():
+    return state.prefix_dropdown["values"]
@@ -0,0 +1,239 @@
+import re
+import fnmatch
+import calendar
+from bisect import bisect_right
+from datetime import datetime, timezone
+
+# -------------------------------------------------------------------
+# Listing index
+# -------------------------------------------------------------------
+# Built once per listing. All lower-cased names are joined into one text
+# block with a table of line offsets, so a substring search is a C-level
+# scan of that block instead of a Python loop over every row. Queries that
+# extend the previous one only re-check the previous matches.
+#
+# Sort keys (normalized names, int sizes, epoch dates) are computed once per
+# column and each column's ordering is cached, so re-sorting or flipping the
+# direction never re-parses a row.
+#
+# Query syntax: size/date predicates are separate tokens, combined with AND;
+# the rest of the query, spaces included, is one text match on the name:
+#   report            substring of the name (case-insensitive)
+#   *.csv / inv_??    glob on the whole name
+#   re:^inv_\d+       regular expression on the name
+#   size>10MB  size<=512k  modified>=2025-01-01  created<2025-02-01T08:00:00
+SIZE_UNITS = {"": 1, "b": 1, "k": 1024, "kb": 1024, "m": 1024 ** 2, "mb": 1024 ** 2,
+              "g": 1024 ** 3, "gb": 1024 ** 3}
+PREDICATE = re.compile(r"^(size|modified|created)(>=|<=|>|<|=)(.+)$", re.IGNORECASE)
+DATE_FIELDS = {"modified": "modifiedDate", "created": "createdDate"}
+SORT_FIELDS = {"Size": "size", "Created Date": "createdDate", "Modified Date": "modifiedDate"}
+SPARSE_FILTER_RATIO = 8     # below 1/8 of the rows, sort the matches instead of scanning the ordering
+
+
+_day_epochs = {}
+
+
+def _day_epoch(day):
+    epoch = _day_epochs.get(day)
+    if epoch is None:
+        epoch = calendar.timegm((int(day[0:4]), int(day[5:7]), int(day[8:10]), 0, 0, 0))
+        _day_epochs[day] = epoch
+    return epoch
+
+
+def to_epoch(value):
+    """Epoch seconds of an API timestamp (YYYY-MM-DDTHH:MM:SSZ); 0 when missing or malformed."""
+    try:
+        # slicing is far cheaper than strptime when called for every row of a listing, and the
+        # files of one prefix span few distinct days, so the calendar part is looked up
+        return (_day_epoch(value[0:10])
+                + int(value[11:13]) * 3600 + int(value[14:16]) * 60 + int(value[17:19]))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _parse_size(text):
+    match = re.match(r"^(\d+(?:\.\d+)?)\s*([a-z]*)$", text.strip().lower())
+    if not match or match.group(2) not in SIZE_UNITS:
+        raise ValueError(f"invalid size '{text}'")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2)])
+
+
+def _parse_date(text):
+    for fmt in ("%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return int(datetime.strptime(text.strip().rstrip("Z"), fmt).replace(tzinfo=timezone.utc).timestamp())
+        except ValueError:
+            continue
+    raise ValueError(f"invalid date '{text}'")
+
+
+_COMPARE = {
+    ">": lambda a, b: a > b,
+    "<": lambda a, b: a < b,
+    ">=": lambda a, b: a >= b,
+    "<=": lambda a, b: a <= b,
+    "=": lambda a, b: a == b,
+}
+
+
+def parse_query(query):
+    """Split a filter query into (text, predicates); raises ValueError on a malformed predicate.
+    The text keeps its case so regular expressions such as \\D survive."""
+    text_tokens = []
+    predicates = []
+    for token in query.split(" "):
+        match = PREDICATE.match(token)
+        if not match:
+            text_tokens.append(token)
+            continue
+        field, op, value = match.group(1).lower(), match.group(2), match.group(3)
+        bound = _parse_size(value) if field == "size" else _parse_date(value)
+        predicates.append((field, op, bound))
+    return " ".join(text_tokens).strip(), tuple(predicates)
+
+
+class ListingIndex:
+    """Search and sort structure over one listing (a list of file dicts)."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self._names = None
+        self._blob = None
+        self._starts = None
+        self._sizes = None
+        self._dates = {}
+        self._orders = {}       # (field, reverse) -> row indices in sorted order
+        self._ranks = {}        # field -> position of each row in the ascending order
+        self._last = None       # (text, predicates, matches) of the previous query
+
+    # ---------------------------------------------------------------
+    # columns for predicates and sorting, computed on first use
+    # ---------------------------------------------------------------
+    @property
+    def names(self):
+        if self._names is None:
+            self._names = [file.get("name", "").lower() for file in self.rows]
+        return self._names
+
+    def _text(self):
+        if self._blob is None:
+            self._blob = "\n".join(self.names)
+            self._starts = []
+            offset = 0
+            for name in self.names:
+                self._starts.append(offset)
+                offset += len(name) + 1
+        return self._blob, self._starts
+
+    def _values(self, field):
+        if field == "name":
+            return self.names
+        if field == "size":
+            if self._sizes is None:
+                self._sizes = []
+                for file in self.rows:
+                    try:
+                        self._sizes.append(int(file.get("size", 0)))
+                    except (TypeError, ValueError):
+                        self._sizes.append(0)
+            return self._sizes
+
+        key = DATE_FIELDS.get(field, field)
+        if key not in self._dates:
+            self._dates[key] = [to_epoch(file.get(key)) for file in self.rows]
+        return self._dates[key]
+
+    # ---------------------------------------------------------------
+    # text matching
+    # ---------------------------------------------------------------
+    def _substring(self, text):
+        blob, starts = self._text()
+        matches = []
+        position = blob.find(text)
+        while position != -1:
+            row = bisect_right(starts, position) - 1
+            matches.append(row)
+            next_row = row + 1
+            if next_row >= len(starts):
+                break
+            position = blob.find(text, starts[next_row])
+        return matches
+
+    def _pattern(self, text):
+        if text.startswith("re:"):
+            return re.compile(text[3:], re.IGNORECASE).search
+        if "*" in text or "?" in text:
+            return re.compile(fnmatch.translate(text.lower())).match
+        return None
+
+    def search(self, query):
+        """Return the indices of the rows matching query, in listing order. Raises ValueError or
+        re.error while the query is malformed (e.g. half-typed)."""
+        text, predicates = parse_query(query)
+        pattern = self._pattern(text)
+        text = text.lower()
+
+        last = self._last
+        if pattern is None and last and last[1] == predicates and last[0] and last[0] in text:
+            # the query only grew, so only the previous matches can still match
+            names = self.names
+            matches = [i for i in last[2] if text in names[i]]
+        elif pattern is not None:
+            matches = [i for i, name in enumerate(self.names) if pattern(name)]
+        elif text:
+            matches = self._substring(text)
+        else:
+            matches = range(len(self.rows))
+
+        for field, op, bound in predicates:
+            values = self._values(field)
+            compare = _COMPARE[op]
+            matches = [i for i in matches if compare(values[i], bound)]
+
+        matches = list(matches)
+        self._last = (text, predicates, matches) if pattern is None else None
+        return matches
+
+    # ---------------------------------------------------------------
+    # sorting
+    # ---------------------------------------------------------------
+    def order(self, column, reverse=False):
+        """Row indices sorted by a grid column; the descending order is a reversed view of the ascending one."""
+        field = SORT_FIELDS.get(column, "name")
+        key = (field, reverse)
+        if key not in self._orders:
+            if reverse:
+                self._orders[key] = self.order(column)[::-1]
+            else:
+                values = self._values(field)
+                self._orders[key] = sorted(range(len(self.rows)), key=values.__getitem__)
+        return self._orders[key]
+
+    def _rank(self, column):
+        field = SORT_FIELDS.get(column, "name")
+        if field not in self._ranks:
+            rank = [0] * len(self.rows)
+            for position, row in enumerate(self.order(column)):
+                rank[row] = position
+            self._ranks[field] = rank
+        return self._ranks[field]
+
+    def view(self, matches=None, column=None, reverse=False):
+        """Rows to display: the filter matches (None = all rows) in the order of the sort column."""
+        if column is None:
+            if matches is None:
+                return list(self.rows)
+            order = matches
+        elif matches is None:
+            order = self.order(column, reverse)
+        elif len(matches) * SPARSE_FILTER_RATIO < len(self.rows):
+            order = sorted(matches, key=self._rank(column).__getitem__, reverse=reverse)
+        else:
+            keep = bytearray(len(self.rows))
+            for i in matches:
+                keep[i] = 1
+            order = [i for i in self.order(column, reverse) if keep[i]]
+
+        rows = self.rows
+        return [rows[i] for i in order]
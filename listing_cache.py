@@ -0,0 +1,100 @@
+import time
+import threading
+from collections import OrderedDict
+import state
+from config_store import int_setting
+
+# -------------------------------------------------------------------
+# Listing cache
+# -------------------------------------------------------------------
+# Prefix and file listings are kept in memory per customer. A listing younger
+# than the TTL is served without calling FTS; an older one (up to the stale
+# limit) is served at once and revalidated in the background, conditionally
+# when the server sent an ETag or Last-Modified. Our own uploads, deletes and
+# moves invalidate the prefixes they touch. Tunable per customer section:
+#   listing_cache_ttl_seconds = 30
+PREFIXES = "prefixes"
+FILES = "files"
+
+_entries = OrderedDict()
+_lock = threading.Lock()
+
+
+class CachedListing:
+    """One cached listing with the validators the server returned for it."""
+
+    def __init__(self, rows, etag=None, last_modified=None, ttl_seconds=None):
+        self.rows = rows
+        self.etag = etag
+        self.last_modified = last_modified
+        self.ttl_seconds = state.LISTING_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.fetched_at = time.monotonic()
+
+    def age(self):
+        return time.monotonic() - self.fetched_at
+
+    def is_fresh(self):
+        return self.age() < self.ttl_seconds
+
+    def touch(self):
+        """The server confirmed the listing is unchanged."""
+        self.fetched_at = time.monotonic()
+
+    def conditional_headers(self):
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def ttl(config):
+    """The listing TTL in seconds of a customer's config section (a CustomerSnapshot's config)."""
+    return int_setting(config, "listing_cache_ttl_seconds", state.LISTING_CACHE_TTL_SECONDS)
+
+
+def _key(kind, prefix, customer=None):
+    return customer or state.selected_customer or "default", kind, prefix
+
+
+def get(kind, prefix="", customer=None):
+    """Return the cached listing, or None when missing or older than the stale limit."""
+    key = _key(kind, prefix, customer)
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None:
+            return None
+        if entry.age() > max(state.LISTING_CACHE_MAX_STALE_SECONDS, entry.ttl_seconds):
+            del _entries[key]
+            return None
+        _entries.move_to_end(key)
+        return entry
+
+
+def put(kind, prefix, rows, etag=None, last_modified=None, customer=None, ttl_seconds=None):
+    """Cache a listing for customer; ttl_seconds is the customer's ttl(), fixed for the entry."""
+    entry = CachedListing(rows, etag, last_modified, ttl_seconds)
+    with _lock:
+        _entries[_key(kind, prefix, customer)] = entry
+        _entries.move_to_end(_key(kind, prefix, customer))
+        while len(_entries) > state.LISTING_CACHE_MAX_ENTRIES:
+            _entries.popitem(last=False)
+    return entry
+
+
+def invalidate(prefixes=None, customer=None):
+    """Drop the file listings of the given prefixes (all listings when None) for a customer (all when None)."""
+    with _lock:
+        for key in list(_entries):
+            entry_customer, kind, prefix = key
+            if customer is not None and entry_customer != customer:
+                continue
+            if prefixes is not None and (kind != FILES or prefix not in prefixes):
+                continue
+            del _entries[key]
+
+
+def invalidate_files(*prefixes, customer=None):
+    """Drop a customer's (the selected one when None) file listings of prefixes after we changed them."""
+    invalidate(prefixes, _key(FILES, "", customer)[0])
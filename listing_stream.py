@@ -0,0 +1,68 @@
+import re
+import json
+import codecs
+
+# -------------------------------------------------------------------
+# Incremental resultSet parser
+# -------------------------------------------------------------------
+# /listfiles answers {"resultSet": [{...}, {...}, ...]}. Instead of waiting
+# for the whole body and json-loading it, the streamed text is fed in as it
+# arrives and each complete file entry is decoded on its own, so rows can
+# be shown while the rest of a large listing is still on the wire.
+ARRAY_START = re.compile(r'"resultSet"\s*:\s*\[')
+SEPARATORS = " \t\r\n,"
+
+
+class ResultSetParser:
+    """Feed raw response bytes; get back the file entries completed by each chunk."""
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._started = False
+        self.finished = False
+
+    def feed(self, data):
+        """Return the list of entries fully contained in the data received so far."""
+        if self.finished:
+            return []
+        text = self._text_decoder.decode(data)
+        self._buffer += text
+
+        if not self._started:
+            match = ARRAY_START.search(self._buffer)
+            if not match:
+                return []
+            self._buffer = self._buffer[match.end():]
+            self._started = True
+        elif "}" not in text and "]" not in text:
+            return []  # every entry ends with '}', so nothing can have completed
+
+        entries = []
+        buffer = self._buffer
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in SEPARATORS:
+                position += 1
+            if position >= len(buffer):
+                break
+            if buffer[position] == "]":
+                self.finished = True
+                position += 1
+                break
+            try:
+                entry, position = self._decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                break  # entry not complete yet
+            if not isinstance(entry, dict):
+                raise ValueError("resultSet entry is not an object")
+            entries.append(entry)
+
+        self._buffer = buffer[position:]
+        return entries
+
+    def close(self):
+        """Raise ValueError if the body ended before the resultSet array was complete."""
+        if not self.finished:
+            raise ValueError("resultSet missing or truncated")
@@ -1,7 +1,12 @@
 import os
+import sys
+import time
+import queue
+import atexit
+import threading
 from datetime import datetime
-import tkinter as tk
 import state
+import ui_events
 
 # -------------------------------------------------------------------
 # Configuration
@@ -9,6 +14,8 @@ import state
 MAX_LOG_SIZE_MB = 10        # roll over threshold
 MAX_LOG_SIZE_BYTES = MAX_LOG_SIZE_MB * 1024 * 1024
 MAX_LOG_BACKUPS = 5         # retain only last 5 rolled logs
+FLUSH_INTERVAL_SECONDS = 0.2    # a batch is written at most this long after its first message
+FLUSH_BATCH_SIZE = 1000         # ... or as soon as it holds this many messages
 
 
 def setup_logging():
@@ -20,7 +27,7 @@ def setup_logging():
         state.LOG_FILE_NAME = "fts_log.txt"
 
     state.LOG_FILE = os.path.join(state.LOG_DIR, state.LOG_FILE_NAME)
-    print(f"✅ Logging initialized at: {state.LOG_FILE}")
+    print(f"✅ Logging initialized at: {state.LOG_FILE}", file=sys.stderr)
 
 
 def _cleanup_old_logs():
@@ -43,30 +50,108 @@ def _cleanup_old_logs():
         for old_file in rolled_files[MAX_LOG_BACKUPS:]:
             try:
                 os.remove(old_file)
-                print(f"🗑️ Removed old log file: {os.path.basename(old_file)}")
+                print(f"🗑️ Removed old log file: {os.path.basename(old_file)}", file=sys.stderr)
             except Exception as e:
-                print(f"⚠️ Failed to delete old log {old_file}: {e}")
-
-
-def _roll_log_if_needed():
-    """Check log file size and roll over if > MAX_LOG_SIZE_MB."""
-    if not os.path.exists(state.LOG_FILE):
-        return
-
-    file_size = os.path.getsize(state.LOG_FILE)
-    if file_size >= MAX_LOG_SIZE_BYTES:
+                print(f"⚠️ Failed to delete old log {old_file}: {e}", file=sys.stderr)
+
+
+class _LogWriter:
+    """
+    Background writer: messages are queued by log_message and written in batches by one
+    thread that keeps the log file open. The file size is tracked in memory for rollover,
+    and whatever is queued is written when the interpreter exits.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._file = None
+        self._size = 0
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def put(self, log_entry):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="fts-log-writer", daemon=True)
+                    self._thread.start()
+        self._queue.put(log_entry)
+
+    def _open(self):
+        self._file = open(state.LOG_FILE, "a", encoding="utf-8")
+        self._size = self._file.tell()
+
+    def _roll(self):
+        """Roll the log file over once it has reached MAX_LOG_SIZE_MB."""
+        self._file.close()
+        self._file = None
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        rolled_file = os.path.join(
-            state.LOG_DIR,
-            f"{os.path.splitext(state.LOG_FILE_NAME)[0]}_{timestamp}.txt"
-        )
+        base = os.path.splitext(state.LOG_FILE_NAME)[0]
+        rolled_file = os.path.join(state.LOG_DIR, f"{base}_{timestamp}.txt")
+        sequence = 1
+        while os.path.exists(rolled_file):  # a busy batch can fill the log twice within a second
+            rolled_file = os.path.join(state.LOG_DIR, f"{base}_{timestamp}_{sequence}.txt")
+            sequence += 1
 
         try:
             os.rename(state.LOG_FILE, rolled_file)
-            print(f"🔁 Rolled log file to: {rolled_file}")
+            print(f"🔁 Rolled log file to: {rolled_file}", file=sys.stderr)
             _cleanup_old_logs()  # remove older backups
         except Exception as e:
-            print(f"⚠️ Log rollover failed: {e}")
+            print(f"⚠️ Log rollover failed: {e}", file=sys.stderr)
+
+    def _write(self, entries):
+        try:
+            if self._file is None:
+                self._open()
+            data = "".join(entry + "\n" for entry in entries)
+            self._file.write(data)
+            self._file.flush()
+            self._size += len(data.encode("utf-8"))
+            if self._size >= MAX_LOG_SIZE_BYTES:
+                self._roll()
+        except Exception as e:
+            print(f"⚠️ Failed to write log: {e}", file=sys.stderr)
+
+    def _run(self):
+        while True:
+            entry = self._queue.get()
+            if entry is None:
+                return
+            entries = [entry]
+            deadline = time.monotonic() + FLUSH_INTERVAL_SECONDS
+            # gather whatever else arrives shortly so busy transfers cost one write per batch
+            while len(entries) < FLUSH_BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                try:
+                    entry = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is None:
+                    self._write(entries)
+                    return
+                entries.append(entry)
+            self._write(entries)
+
+    def close(self):
+        """Write out everything queued and close the file; registered with atexit."""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._thread = None
+
+
+_writer = _LogWriter()
+atexit.register(_writer.close)
+
+
+def flush_logs():
+    """Write out every message logged so far and close the file; later messages reopen it."""
+    _writer.close()
 
 
 def log_message(message):
@@ -87,20 +172,12 @@ def log_message(message):
     else:
         color = "#00008B"
 
-    # Write to Tkinter log window if present
-    if getattr(state, "log_window", None):
-        state.log_window.tag_config(color, foreground=color)
-        state.log_window.insert(tk.END, f"{log_entry}\n", color)
-        state.log_window.yview(tk.END)
+    # Hand the line to the Tkinter log window, which inserts queued lines once per frame
+    if ui_events.is_started():
+        ui_events.post_log(f"{log_entry}\n", color)
 
     # Ensure log setup
     if not hasattr(state, "LOG_FILE"):
         setup_logging()
 
-    # Roll if needed and then write
-    _roll_log_if_needed()
-    try:
-        with open(state.LOG_FILE, "a", encoding="utf-8") as log_file:
-            log_file.write(log_entry + "\n")
-    except Exception as e:
-        print(f"⚠️ Failed to write log: {e}")
+    _writer.put(log_entry)
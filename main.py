@@ -1,8 +1,8 @@
+import startup_timing  # first, so startup milestones count from process start
 import sys
 import os
 import state
 import log_utils
-from ui_main import launch_main_ui
 
 if __name__ == "__main__":
     if getattr(sys, 'frozen', False):
@@ -13,4 +13,11 @@ if __name__ == "__main__":
         state.BASE_DIR = os.path.dirname(os.path.abspath(__file__))
     # Create logs folder + file before UI loads
     log_utils.setup_logging()
+
+    if "--cli" in sys.argv[1:]:
+        # Headless mode: keep Tkinter off this path entirely
+        from cli import run_cli
+        sys.exit(run_cli([arg for arg in sys.argv[1:] if arg != "--cli"]))
+
+    from ui_main import launch_main_ui
     launch_main_ui()
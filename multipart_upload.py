@@ -0,0 +1,175 @@
+import os
+import concurrent.futures
+from urllib.parse import urlsplit
+import state
+from log_utils import log_message
+from api import customer_snapshot
+from config_store import int_setting
+from session_utils import get_par_session
+from bandwidth_utils import throttle, is_limited
+from retry_utils import send_with_retry
+
+MB = 1024 * 1024
+MIN_PART_SIZE = 10 * MB     # object storage rejects smaller non-final parts
+MAX_PARTS = 10000           # object storage part number limit
+STREAM_BLOCK_SIZE = 64 * 1024
+
+
+def get_multipart_settings(config):
+    """Return (threshold_bytes, part_size_bytes, part_concurrency) from a customer's config section."""
+    threshold = int_setting(config, "multipart_threshold_mb", state.MULTIPART_THRESHOLD_MB) * MB
+    part_size = max(int_setting(config, "multipart_part_size_mb", state.MULTIPART_PART_SIZE_MB) * MB, MIN_PART_SIZE)
+    concurrency = max(int_setting(config, "multipart_part_concurrency", state.MULTIPART_PART_CONCURRENCY), 1)
+    return threshold, part_size, concurrency
+
+
+def should_use_multipart(file_size, config):
+    threshold, _, _ = get_multipart_settings(config)
+    return file_size >= threshold
+
+
+class _FilePart:
+    """Read-only, streamable view over one byte range of a local file."""
+
+    def __init__(self, file_path, offset, length, throttled=False, customer=None):
+        self._file = open(file_path, "rb")
+        self._file.seek(offset)
+        self._remaining = length
+        self._length = length
+        self._throttled = throttled
+        self._customer = customer
+
+    def __len__(self):
+        return self._length
+
+    def read(self, size=-1):
+        if self._remaining <= 0:
+            return b""
+        if size is None or size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._file.read(size)
+        self._remaining -= len(data)
+        if self._throttled and data:
+            throttle(len(data), self._customer)
+        return data
+
+    def __iter__(self):
+        while True:
+            block = self.read(STREAM_BLOCK_SIZE)
+            if not block:
+                return
+            yield block
+
+    def close(self):
+        self._file.close()
+
+
+def _plan_parts(file_size, part_size):
+    """Split file_size into (part_number, offset, length) tuples within the part count limit."""
+    if file_size > part_size * MAX_PARTS:
+        part_size = -(-file_size // MAX_PARTS)
+
+    parts = []
+    offset = 0
+    part_number = 1
+    while offset < file_size:
+        length = min(part_size, file_size - offset)
+        parts.append((part_number, offset, length))
+        offset += length
+        part_number += 1
+    return parts
+
+
+class PartUploadError(RuntimeError):
+    """A part was refused; response is the last answer, as on requests.HTTPError."""
+
+    def __init__(self, message, response):
+        super().__init__(message)
+        self.response = response
+
+
+def _status_of(error):
+    return getattr(getattr(error, "response", None), "status_code", None)
+
+
+def _upload_part(session, upload_url, file_path, part_number, offset, length, customer):
+    """Upload one part under the shared retry policy before giving up on the whole file."""
+    part_url = f"{upload_url}{part_number}"
+
+    def put_once():
+        part = _FilePart(file_path, offset, length, is_limited(customer), customer)
+        try:
+            return session.put(part_url, data=part, headers={"Content-Length": str(length)})
+        finally:
+            part.close()
+
+    response = send_with_retry("PUT", part_url, put_once)
+    if response.status_code == 200:
+        return response.headers.get("ETag")
+    raise PartUploadError(f"part {part_number} failed: HTTP {response.status_code}: {response.text}", response)
+
+
+def upload_multipart(file_path, access_uri, customer=None):
+    """
+    Upload a file through a PAR access URI as a multipart upload.
+    Parts are pushed concurrently over the pooled PAR session and committed at the end;
+    the upload is aborted on failure so no orphaned parts are left behind.
+    Returns (succeeded, HTTP status that failed it or None), like transfer_service.upload_file,
+    so an expired PAR (401/403/404 on create) can be detected and re-requested.
+    Part sizes and bandwidth limits are those of customer (a CustomerSnapshot).
+    """
+    customer = customer or customer_snapshot()
+    file_name = os.path.basename(file_path)
+    file_size = os.path.getsize(file_path)
+    _, part_size, concurrency = get_multipart_settings(customer.config)
+    parts = _plan_parts(file_size, part_size)
+
+    session = get_par_session()
+    parsed = urlsplit(access_uri)
+    base_url = f"{parsed.scheme}://{parsed.netloc}"
+
+    try:
+        # creating an upload twice would orphan the first one, so it retries like a POST
+        response = send_with_retry("POST", access_uri, lambda: session.put(
+            access_uri, headers={"opc-multipart": "true", "Content-Length": "0"}))
+        response.raise_for_status()
+        upload_path = response.json().get("accessUri")
+    except Exception as e:
+        log_message(f"ERROR! - Failed to start multipart upload for {file_name}: {e}")
+        return False, _status_of(e)
+
+    if not upload_path:
+        log_message(f"ERROR! - Multipart upload for {file_name} returned no accessUri.")
+        return False, None
+
+    upload_url = f"{base_url}{upload_path}"
+    if not upload_url.endswith("/"):
+        upload_url += "/"
+
+    log_message(f"Multipart upload started for {file_name}: {len(parts)} parts of "
+                f"{part_size // MB} MB, {concurrency} in parallel.")
+
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [
+                executor.submit(_upload_part, session, upload_url, file_path, number, offset, length, customer.key)
+                for number, offset, length in parts
+            ]
+            try:
+                for future in concurrent.futures.as_completed(futures):
+                    future.result()
+            except Exception:
+                for future in futures:
+                    future.cancel()
+                raise
+
+        commit_response = send_with_retry("POST", upload_url, lambda: session.post(upload_url))
+        commit_response.raise_for_status()
+        return True, commit_response.status_code
+    except Exception as e:
+        log_message(f"ERROR! - Multipart upload of {file_name} failed, aborting: {e}")
+        try:
+            session.delete(upload_url)
+        except Exception as abort_error:
+            log_message(f"ERROR! - Failed to abort multipart upload for {file_name}: {abort_error}")
+        return False, _status_of(e)
@@ -0,0 +1,75 @@
+import time
+import threading
+import state
+from filter_index import to_epoch
+
+# -------------------------------------------------------------------
+# PAR cache
+# -------------------------------------------------------------------
+# Access URIs issued by /upload and /download are kept per customer, prefix,
+# file and direction until shortly before they expire, so retries, resumed
+# batches and repeat downloads skip the control-plane round trip. Entries
+# inside the refresh margin count as missing and are renewed together with
+# the other files of the next request, i.e. in bulk. Callers pass the customer
+# the request was made for; expired entries are pruned whenever PARs are stored.
+EXPIRY_FIELDS = ("timeExpires", "expiresAt", "expiryTime", "expiration")
+
+_entries = {}
+_lock = threading.Lock()
+
+
+def _key(customer, direction, prefix, file_name):
+    return customer or "default", direction, prefix, file_name
+
+
+def _expiry(entry, now):
+    """Expiry of a parList entry in epoch seconds: its own expiry field, else the configured lifetime."""
+    for field in EXPIRY_FIELDS:
+        value = entry.get(field)
+        if value:
+            expires = to_epoch(value)
+            if expires:
+                return expires
+    return now + state.PAR_TTL_SECONDS
+
+
+def lookup(customer, direction, prefix, file_names):
+    """Split file_names into ({name: accessUri} still valid past the refresh margin, [names to request])."""
+    horizon = time.time() + state.PAR_REFRESH_MARGIN_SECONDS
+    found = {}
+    missing = []
+    with _lock:
+        for file_name in file_names:
+            cached = _entries.get(_key(customer, direction, prefix, file_name))
+            if cached and cached[1] > horizon:
+                found[file_name] = cached[0]
+            else:
+                missing.append(file_name)
+    return found, missing
+
+
+def store(customer, direction, prefix, par_list):
+    """Cache the entries of a parList and return them as {name: accessUri}."""
+    now = time.time()
+    pars = {}
+    with _lock:
+        for key in [k for k, (_, expires) in _entries.items() if expires <= now]:
+            del _entries[key]
+        for entry in par_list:
+            file_name, access_uri = entry.get("name"), entry.get("accessUri")
+            pars[file_name] = access_uri
+            if file_name and access_uri:
+                _entries[_key(customer, direction, prefix, file_name)] = (access_uri, _expiry(entry, now))
+    return pars
+
+
+def discard(customer, direction, prefix, file_name):
+    """Forget a PAR the storage service refused, so the next request issues a new one."""
+    with _lock:
+        _entries.pop(_key(customer, direction, prefix, file_name), None)
+
+
+def clear(customer=None):
+    with _lock:
+        for key in [k for k in _entries if customer is None or k[0] == customer]:
+            del _entries[key]
@@ -0,0 +1,264 @@
+import os
+import json
+import time
+import queue
+import threading
+import state
+from log_utils import log_message
+from session_utils import get_par_session
+from concurrency_utils import data_budget
+from bandwidth_utils import throttle, is_limited
+from retry_utils import send_with_retry, backoff, breaker_for
+
+MB = 1024 * 1024
+CHUNK_SIZE = 256 * 1024
+PART_SUFFIX = ".part"
+JOURNAL_SUFFIX = ".part.json"
+JOURNAL_FLUSH_BYTES = 8 * MB    # record progress at least this often per segment
+
+
+def probe_object(access_uri):
+    """Return (size, supports_ranges, headers) for a PAR object; size is None when not reported."""
+    try:
+        response = send_with_retry("HEAD", access_uri,
+                                   lambda: get_par_session().head(access_uri, allow_redirects=True))
+    except Exception as e:
+        log_message(f"Range probe failed, using single stream: {e}")
+        return None, False, {}
+
+    if response.status_code != 200:
+        return None, False, {}
+
+    length = response.headers.get("Content-Length")
+    size = int(length) if length and length.isdigit() else None
+    supports_ranges = response.headers.get("Accept-Ranges", "").lower() == "bytes"
+    return size, supports_ranges, response.headers
+
+
+def _plan_segments(file_size, segment_size):
+    return [[start, min(start + segment_size, file_size) - 1, 0] for start in range(0, file_size, segment_size)]
+
+
+class DownloadJournal:
+    """
+    Sidecar record of a partial download: the source identity (size, modifiedDate/ETag)
+    and, per segment, how many bytes have been written into the .part file.
+    """
+
+    def __init__(self, journal_path, source):
+        self.path = journal_path
+        self.source = source
+        self.segments = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, journal_path, source):
+        """Return the stored journal if it matches source, else None."""
+        try:
+            with open(journal_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if data.get("source") != source:
+            return None
+
+        journal = cls(journal_path, source)
+        journal.segments = data.get("segments", [])
+        return journal
+
+    def received(self):
+        return sum(segment[2] for segment in self.segments)
+
+    def update(self, index, received):
+        with self._lock:
+            self.segments[index][2] = received
+            self.save()
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"source": self.source, "segments": self.segments}, f)
+        os.replace(tmp_path, self.path)
+
+    def remove(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def _fetch_segment(session, access_uri, part_path, journal, index, customer):
+    """Fetch the unreceived tail of one segment and write it at its offset in the .part file."""
+    start, end, received = journal.segments[index]
+    if start + received > end:
+        return
+
+    headers = {"Range": f"bytes={start + received}-{end}"}
+    response = send_with_retry("GET", access_uri, lambda: session.get(access_uri, headers=headers, stream=True))
+    try:
+        if response.status_code != 206:
+            raise IOError(f"expected 206 for range {start + received}-{end}, got HTTP {response.status_code}")
+
+        limited = is_limited(customer)
+        with open(part_path, "r+b") as file:
+            file.seek(start + received)
+            unrecorded = 0
+            try:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    if limited:
+                        throttle(len(chunk), customer)
+                    file.write(chunk)
+                    received += len(chunk)
+                    unrecorded += len(chunk)
+                    if unrecorded >= JOURNAL_FLUSH_BYTES:
+                        file.flush()
+                        journal.update(index, received)
+                        unrecorded = 0
+            finally:
+                file.flush()
+                journal.update(index, received)
+
+        if start + received != end + 1:
+            raise IOError(f"short read for range {start}-{end}: stopped at {start + received}")
+    finally:
+        response.close()
+
+
+def _run_segments(access_uri, part_path, journal, concurrency, customer):
+    """
+    Fetch every unfinished segment of the journal. The calling worker already holds one
+    data_budget slot; helper streams are only started for slots that are free right now,
+    so segmenting never starves the per-file download pool. Returns the stream count.
+    """
+    session = get_par_session()
+    pending = queue.Queue()
+    for index, (start, end, received) in enumerate(journal.segments):
+        if start + received <= end:
+            pending.put(index)
+
+    errors = []
+
+    def run():
+        while not errors:
+            try:
+                index = pending.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                _fetch_segment(session, access_uri, part_path, journal, index, customer)
+            except Exception as e:
+                errors.append(e)
+
+    def run_helper():
+        try:
+            run()
+        finally:
+            data_budget.release()
+
+    helpers = []
+    for _ in range(min(concurrency, pending.qsize()) - 1):
+        if not data_budget.try_acquire():
+            break
+        helper = threading.Thread(target=run_helper, daemon=True)
+        helper.start()
+        helpers.append(helper)
+
+    run()
+    for helper in helpers:
+        helper.join()
+
+    if errors:
+        raise errors[0]
+    return len(helpers) + 1
+
+
+def _download_single(access_uri, part_path, customer):
+    file_response = send_with_retry("GET", access_uri, lambda: get_par_session().get(access_uri, stream=True))
+    try:
+        file_response.raise_for_status()
+        limited = is_limited(customer)
+        with open(part_path, "wb") as file:
+            for chunk in file_response.iter_content(chunk_size=CHUNK_SIZE):
+                if limited:
+                    throttle(len(chunk), customer)
+                file.write(chunk)
+    finally:
+        file_response.close()
+
+
+def _open_journal(part_path, journal_path, source, size):
+    """Reuse a matching journal and .part file, or start both fresh."""
+    journal = DownloadJournal.load(journal_path, source)
+    if journal and os.path.exists(part_path) and os.path.getsize(part_path) == size:
+        return journal
+
+    journal = DownloadJournal(journal_path, source)
+    if size >= state.RANGED_DOWNLOAD_THRESHOLD_MB * MB:
+        journal.segments = _plan_segments(size, state.RANGED_SEGMENT_SIZE_MB * MB)
+    else:
+        journal.segments = [[0, size - 1, 0]]
+
+    with open(part_path, "wb") as file:
+        file.truncate(size)
+    journal.save()
+    return journal
+
+
+def download_object(access_uri, file_path, expected=None, customer=None):
+    """
+    Download a PAR object to file_path through a .part file and sidecar journal.
+    When the server advertises byte ranges the transfer resumes from the journal
+    (across retries and across runs), and objects above RANGED_DOWNLOAD_THRESHOLD_MB
+    are fetched as parallel Range segments. The .part file is renamed into place only
+    once complete. expected is the listing entry (size, modifiedDate) used to make sure
+    a stale journal is never resumed against a changed object. Bandwidth is charged to customer
+    (a section name; the selected customer when None). Raises on failure.
+    """
+    file_name = os.path.basename(file_path)
+    part_path = file_path + PART_SUFFIX
+    journal_path = file_path + JOURNAL_SUFFIX
+    expected = expected or {}
+
+    size, supports_ranges, headers = probe_object(access_uri)
+
+    if size is None or not supports_ranges:
+        _download_single(access_uri, part_path, customer)
+        os.replace(part_path, file_path)
+        return
+
+    if size == 0:
+        open(file_path, "wb").close()
+        return
+
+    source = {
+        "size": size,
+        "modifiedDate": expected.get("modifiedDate") or headers.get("Last-Modified"),
+        "etag": headers.get("ETag"),
+    }
+    journal = _open_journal(part_path, journal_path, source, size)
+
+    resumed_from = journal.received()
+    if resumed_from:
+        log_message(f"Resuming {file_name} from {resumed_from} of {size} bytes.")
+
+    last_error = None
+    for attempt in range(1, state.DOWNLOAD_RETRIES + 2):
+        try:
+            streams = _run_segments(access_uri, part_path, journal, state.RANGED_SEGMENT_CONCURRENCY, customer)
+            break
+        except Exception as e:
+            last_error = e
+            log_message(f"ERROR! - {file_name} interrupted at {journal.received()} of {size} bytes "
+                        f"(attempt {attempt}): {e}")
+            if attempt <= state.DOWNLOAD_RETRIES:
+                time.sleep(backoff(attempt - 1))
+                breaker_for(access_uri).wait()
+    else:
+        raise IOError(f"download incomplete after retries, kept {part_path} for resume: {last_error}")
+
+    os.replace(part_path, file_path)
+    journal.remove()
+
+    if len(journal.segments) > 1:
+        log_message(f"{file_name} downloaded in {len(journal.segments)} segments over {streams} streams.")
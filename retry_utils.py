@@ -0,0 +1,162 @@
+import time
+import random
+import asyncio
+import threading
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+import requests
+import state
+from log_utils import log_message
+
+# -------------------------------------------------------------------
+# Retry policy and circuit breakers
+# -------------------------------------------------------------------
+# Transient failures (connection resets, timeouts, 408/429/5xx) are retried
+# with capped exponential backoff and full jitter, or after the server's
+# Retry-After. Idempotent methods retry on all of them; POST only when the
+# request provably was not processed (429/503, connect failures).
+# Every host has a circuit breaker: after CIRCUIT_FAILURE_THRESHOLD transient
+# failures in a row it opens and callers wait instead of sending, then one
+# probe request decides whether it closes again.
+RETRY_STATUSES = (408, 429, 500, 502, 503, 504)
+UNPROCESSED_STATUSES = (429, 503)
+IDEMPOTENT_METHODS = ("GET", "HEAD", "PUT", "DELETE", "OPTIONS")
+
+
+def is_retryable(method, status=None, network_error=False, connect_error=False):
+    """True when a failed request may be sent again."""
+    if connect_error:
+        return True  # never reached the server
+    idempotent = method.upper() in IDEMPOTENT_METHODS
+    if network_error:
+        return idempotent
+    return status in (RETRY_STATUSES if idempotent else UNPROCESSED_STATUSES)
+
+
+def is_network_error(error):
+    return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+
+def retry_after_seconds(value):
+    """Parse a Retry-After header (seconds or HTTP date); None when absent or invalid."""
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value.strip())
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff(attempt, retry_after=None):
+    """Delay before retry number attempt (0-based): Retry-After if given, else full jitter, both capped."""
+    if retry_after is not None:
+        return min(retry_after, state.RETRY_MAX_DELAY_SECONDS)
+    return random.uniform(0, min(state.RETRY_MAX_DELAY_SECONDS, state.RETRY_BASE_DELAY_SECONDS * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker for one host."""
+
+    def __init__(self, host):
+        self.host = host
+        self._failures = 0
+        self._open_until = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def _admit(self):
+        """Return 0 when a request may go now, else how long to wait before asking again."""
+        with self._lock:
+            if self._failures < state.CIRCUIT_FAILURE_THRESHOLD:
+                return 0
+            remaining = self._open_until - time.monotonic()
+            if remaining > 0:
+                return min(remaining, 1.0)
+            if self._probing:
+                return 0.5
+            self._probing = True  # half-open: this caller is the probe
+            return 0
+
+    def wait(self):
+        """Block while the circuit is open."""
+        delay = self._admit()
+        while delay:
+            time.sleep(delay)
+            delay = self._admit()
+
+    async def wait_async(self):
+        delay = self._admit()
+        while delay:
+            await asyncio.sleep(delay)
+            delay = self._admit()
+
+    def record(self, ok):
+        with self._lock:
+            was_open = self._failures >= state.CIRCUIT_FAILURE_THRESHOLD
+            self._probing = False
+            if ok:
+                if was_open:
+                    log_message(f"✅ Circuit for {self.host} closed, requests resumed.")
+                self._failures = 0
+                return
+
+            self._failures += 1
+            if self._failures >= state.CIRCUIT_FAILURE_THRESHOLD and time.monotonic() >= self._open_until:
+                self._open_until = time.monotonic() + state.CIRCUIT_OPEN_SECONDS
+                log_message(f"ERROR! - {self._failures} failures in a row from {self.host}, pausing its requests "
+                            f"for {state.CIRCUIT_OPEN_SECONDS}s.")
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(url):
+    host = urlsplit(url).netloc
+    with _breakers_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(host)
+            _breakers[host] = breaker
+        return breaker
+
+
+def send_with_retry(method, url, send):
+    """
+    Call send() -> requests.Response under the retry policy and the host's circuit breaker.
+    send must build the request from scratch (e.g. reopen file bodies) on every call.
+    Returns the last response, successful or not; raises the last network error.
+    """
+    breaker = breaker_for(url)
+    host = breaker.host
+    for attempt in range(state.RETRY_ATTEMPTS + 1):
+        last = attempt == state.RETRY_ATTEMPTS
+        breaker.wait()
+        try:
+            response = send()
+        except Exception as e:
+            if not is_network_error(e):
+                breaker.record(True)  # e.g. a local file error says nothing about the host
+                raise
+            breaker.record(False)
+            connect_error = isinstance(e, requests.exceptions.ConnectTimeout)
+            if last or not is_retryable(method, network_error=True, connect_error=connect_error):
+                raise
+            delay = backoff(attempt)
+            log_message(f"Retrying {method} to {host} in {delay:.1f}s after {type(e).__name__} "
+                        f"(attempt {attempt + 1} of {state.RETRY_ATTEMPTS}).")
+            time.sleep(delay)
+            continue
+
+        failing = response.status_code in RETRY_STATUSES
+        breaker.record(not failing)
+        if not failing or last or not is_retryable(method, response.status_code):
+            return response
+
+        delay = backoff(attempt, retry_after_seconds(response.headers.get("Retry-After")))
+        log_message(f"Retrying {method} to {host} in {delay:.1f}s after HTTP {response.status_code} "
+                    f"(attempt {attempt + 1} of {state.RETRY_ATTEMPTS}).")
+        response.close()
+        time.sleep(delay)
@@ -0,0 +1,74 @@
+import threading
+import state
+from concurrency_utils import api_budget, data_budget, response_feedback
+
+# -------------------------------------------------------------------
+# Pooled HTTP sessions
+# -------------------------------------------------------------------
+# One session per (customer, kind). "api" talks to the FTS host and
+# OCI IAM, "par" talks to the object-storage hosts behind the PAR
+# access URIs, so bulk data transfers never starve the control calls.
+API_SESSION = "api"
+PAR_SESSION = "par"
+
+POOL_HOSTS = 4              # distinct hosts kept pooled per session
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def _customer_key(customer=None):
+    return customer or state.selected_customer or "default"
+
+
+def _new_session(budget):
+    """Create a keep-alive session pooled to the budget's ceiling and reporting back to it."""
+    # imported on first use to keep requests off the UI startup path
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=budget.maximum)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.hooks["response"].append(response_feedback(budget))
+    return session
+
+
+def get_session(kind, customer=None):
+    """Return the shared session of the given kind for a customer, creating it on first use."""
+    key = (_customer_key(customer), kind)
+    session = _sessions.get(key)
+    if session is not None:
+        return session
+
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = _new_session(api_budget if kind == API_SESSION else data_budget)
+            _sessions[key] = session
+        return session
+
+
+def get_api_session(customer=None):
+    return get_session(API_SESSION, customer)
+
+
+def get_par_session(customer=None):
+    return get_session(PAR_SESSION, customer)
+
+
+def close_sessions(customer=None):
+    """Close pooled sessions for one customer, or for every customer when none is given."""
+    with _sessions_lock:
+        keys = [k for k in _sessions if customer is None or k[0] == customer]
+        sessions = [_sessions.pop(k) for k in keys]
+
+    for session in sessions:
+        try:
+            session.close()
+        except Exception:
+            pass
+
+    from async_engine import close_async_sessions
+    close_async_sessions(customer)
@@ -0,0 +1,91 @@
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from startup_timing import BENCHMARK_ENV
+
+# -------------------------------------------------------------------
+# Startup benchmark
+# -------------------------------------------------------------------
+#   python startup_benchmark.py [--runs 5] [--customer NAME] [--json]
+# Starts the UI several times with FTS_STARTUP_BENCHMARK set; it reports its
+# milestones (see startup_timing.py) and closes itself once the transfer
+# modules are loaded, before asking for the password. With --customer the
+# command line's "list-prefixes" is timed as well, i.e. time-to-first-listing
+# of a scripted run (needs FTS_ENCRYPTION_PASSWORD and a reachable FTS host).
+# --json prints one document, suitable for keeping a history across changes.
+MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+
+def _run_ui():
+    """Start the UI once and return {milestone: ms} plus the process wall time."""
+    env = dict(os.environ, **{BENCHMARK_ENV: "1"})
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, MAIN], env=env, capture_output=True, text=True, timeout=120)
+    wall_ms = (time.perf_counter() - started) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(f"main.py exited with {result.returncode}: {result.stderr.strip()}")
+
+    milestones = {}
+    for line in result.stdout.splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        milestones[record["milestone"]] = record["ms"]
+    milestones["process exit"] = round(wall_ms, 1)
+    return milestones
+
+
+def _run_cli_listing(customer, config):
+    """Time one 'main.py --cli list-prefixes' run in ms (start to JSON answer)."""
+    command = [sys.executable, MAIN, "--cli", "--customer", customer, "--config", config, "list-prefixes"]
+    started = time.perf_counter()
+    result = subprocess.run(command, capture_output=True, text=True, timeout=300)
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+    if result.returncode != 0:
+        raise RuntimeError(f"list-prefixes exited with {result.returncode}: {result.stdout.strip()}")
+    return elapsed_ms
+
+
+def _summary(samples):
+    return {
+        "median_ms": round(statistics.median(samples), 1),
+        "min_ms": min(samples),
+        "max_ms": max(samples),
+        "runs": len(samples),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure time-to-first-window and time-to-first-listing.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--customer", help="also time the CLI listing of this customer section")
+    parser.add_argument("--config", default="config.ini")
+    parser.add_argument("--json", action="store_true", help="print the results as one JSON document")
+    args = parser.parse_args(argv)
+
+    samples = {}
+    for _ in range(args.runs):
+        for milestone, ms in _run_ui().items():
+            samples.setdefault(milestone, []).append(ms)
+    if args.customer:
+        # the first run may still fetch a token; later ones reuse the saved one
+        samples["cli first listing"] = [_run_cli_listing(args.customer, args.config) for _ in range(args.runs)]
+
+    results = {milestone: _summary(values) for milestone, values in samples.items()}
+    if args.json:
+        print(json.dumps({"python": sys.version.split()[0], "results": results}))
+        return 0
+
+    for milestone, summary in results.items():
+        print(f"{milestone:<20} median {summary['median_ms']:>8.1f} ms   "
+              f"min {summary['min_ms']:>8.1f}   max {summary['max_ms']:>8.1f}   ({summary['runs']} runs)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+import os
+import sys
+import json
+import time
+from log_utils import log_message
+
+# -------------------------------------------------------------------
+# Startup milestones
+# -------------------------------------------------------------------
+# main.py imports this module first, so times are measured from (nearly)
+# process start. Each milestone is logged once, when it is first reached:
+#   first window    - the main window is mapped with the customer list
+#   modules loaded  - requests, the transfer engine etc. finished importing
+#   first listing   - the first prefix or file listing is on screen
+# With FTS_STARTUP_BENCHMARK set the milestones are also printed to stdout as
+# JSON lines and the UI closes once it is ready (see startup_benchmark.py).
+BENCHMARK_ENV = "FTS_STARTUP_BENCHMARK"
+
+_started = time.perf_counter()
+_reached = {}
+
+
+def is_benchmark():
+    return bool(os.environ.get(BENCHMARK_ENV))
+
+
+def mark(milestone):
+    """Record milestone the first time it is reached; returns its time in ms since start."""
+    if milestone in _reached:
+        return _reached[milestone]
+    elapsed_ms = round((time.perf_counter() - _started) * 1000, 1)
+    _reached[milestone] = elapsed_ms
+    log_message(f"Startup: {milestone} after {elapsed_ms:.0f} ms")
+    if is_benchmark():
+        print(json.dumps({"milestone": milestone, "ms": elapsed_ms}))
+        sys.stdout.flush()
+    return elapsed_ms
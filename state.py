@@ -9,6 +9,7 @@ prefix_dropdown = None
 selected_customer = None
 
 file_tree = None
+file_grid = None
 log_window = None
 filter_entry = None
 file_date = None
@@ -32,8 +33,53 @@ LOG_DIR = None
 LOG_FILE = None
 BASE_DIR = None
 
-MAX_THREADS = 25
+MAX_THREADS = 25             # starting concurrency, tuned at runtime by concurrency_utils
+CONCURRENCY_MIN = 4
+CONCURRENCY_MAX = 128        # ceiling for PAR data streams
+API_CONCURRENCY_MAX = 64     # ceiling for FTS API calls
+CONCURRENCY_STEP = 2
+CONCURRENCY_WINDOW_SECONDS = 2
+
+RETRY_ATTEMPTS = 4             # retries of a transient failure, on top of the first attempt
+RETRY_BASE_DELAY_SECONDS = 0.5
+RETRY_MAX_DELAY_SECONDS = 30
+CIRCUIT_FAILURE_THRESHOLD = 8  # consecutive transient failures before a host is paused
+CIRCUIT_OPEN_SECONDS = 30
+
+PAR_BATCH_SIZE = 1000          # files per /upload PAR request
+PAR_PREFETCH_BATCHES = 2       # PAR batches requested ahead of the running uploads
+PAR_TTL_SECONDS = 15 * 60      # assumed PAR lifetime when the service does not say
+PAR_REFRESH_MARGIN_SECONDS = 120   # cached PARs this close to expiry are renewed
+
+MULTIPART_THRESHOLD_MB = 128
+MULTIPART_PART_SIZE_MB = 64
+MULTIPART_PART_CONCURRENCY = 4
+
+RANGED_DOWNLOAD_THRESHOLD_MB = 128
+RANGED_SEGMENT_SIZE_MB = 32
+RANGED_SEGMENT_CONCURRENCY = 8
+DOWNLOAD_RETRIES = 3
+
+USE_ASYNC_ENGINE = True
+ASYNC_MAX_CONCURRENCY = 200
+ASYNC_MAX_FILE_MB = 8
+
+DELETE_BATCH_SIZE = 500       # files per /delete call (customer key: delete_batch_size)
+MOVE_BATCH_SIZE = 500         # files per /movefiles call (customer key: move_batch_size)
+LISTING_BATCH_SIZE = 2000      # rows per grid update while a listing streams in
+listing_generation = 0         # bumped per listing so late batches of an older one are dropped
+LISTING_CACHE_TTL_SECONDS = 30        # cached listings younger than this are served without a request
+LISTING_CACHE_MAX_STALE_SECONDS = 600  # older ones are still shown while being revalidated, up to this age
+LISTING_CACHE_MAX_ENTRIES = 16
+listing_index = None
+filter_matches = None       # row indices matching the filter box, None when it is empty
+sort_column = None
+sort_reverse = False
+filter_after_id = None
+FILTER_DEBOUNCE_MS = 150
 
 token_cache = {}
+TOKEN_REFRESH_MARGIN_SECONDS = 300   # tokens closer to expiry are renewed in the background
+TOKEN_EXPIRY_SAFETY_SECONDS = 30     # tokens closer to expiry than this are not handed out any more
 sort_orders = {}
 file_data = []
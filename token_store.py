@@ -0,0 +1,106 @@
+import os
+import json
+import threading
+from datetime import datetime
+import state
+from log_utils import log_message
+
+# -------------------------------------------------------------------
+# On-disk token cache
+# -------------------------------------------------------------------
+# Access tokens are saved next to the config file (config.ini -> config.tokens),
+# encrypted with state.fernet, so the next start or CLI run reuses them instead
+# of calling IAM first. The file is read once, on the first token lookup;
+# expired tokens are dropped on load and on every save. A file written under
+# another encryption password simply fails to decrypt and is ignored.
+TOKEN_FILE_SUFFIX = ".tokens"
+
+_loaded = False
+_lock = threading.Lock()
+
+
+def _token_file():
+    return os.path.splitext(os.path.abspath(state.CONFIG_FILE))[0] + TOKEN_FILE_SUFFIX
+
+
+def load():
+    """Merge the unexpired saved tokens into state.token_cache; only the first call reads the file."""
+    global _loaded
+    if _loaded or state.fernet is None:
+        return
+    with _lock:
+        if _loaded:
+            return
+        _loaded = True
+
+        path = _token_file()
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, "rb") as f:
+                saved = json.loads(state.fernet.decrypt(f.read()))
+        except Exception as e:
+            log_message(f"ERROR! - Ignoring saved access tokens in {path}: {type(e).__name__}")
+            return
+
+        now = datetime.now()
+        for customer, entry in saved.items():
+            try:
+                expires_at = datetime.fromisoformat(entry["expires_at"])
+                refresh_at = datetime.fromisoformat(entry.get("refresh_at") or entry["expires_at"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if expires_at <= now or customer in state.token_cache:
+                continue
+            state.token_cache[customer] = {
+                "access_token": entry.get("access_token"),
+                "expires_at": expires_at,
+                "refresh_at": refresh_at,
+                "client_id": entry.get("client_id"),
+            }
+        if state.token_cache:
+            log_message(f"Loaded saved access tokens for {', '.join(sorted(state.token_cache))}.")
+
+
+def save():
+    """Write the unexpired tokens of state.token_cache, replacing the file atomically."""
+    if state.fernet is None:
+        return
+    load()  # keep the saved tokens of customers not used yet in this run
+    now = datetime.now()
+    tokens = {
+        customer: {
+            "access_token": entry["access_token"],
+            "expires_at": entry["expires_at"].isoformat(),
+            "refresh_at": entry.get("refresh_at", entry["expires_at"]).isoformat(),
+            "client_id": entry.get("client_id"),
+        }
+        for customer, entry in list(state.token_cache.items())
+        if entry.get("access_token") and entry.get("expires_at") and entry["expires_at"] > now
+    }
+
+    path = _token_file()
+    with _lock:
+        try:
+            if not tokens:
+                if os.path.exists(path):
+                    os.remove(path)
+                return
+            data = state.fernet.encrypt(json.dumps(tokens).encode())
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            log_message(f"ERROR! - Failed to save access tokens: {e}")
+
+
+def forget(customer=None):
+    """Drop the token of one customer section (all when None) from memory and disk."""
+    load()
+    if customer is None:
+        state.token_cache.clear()
+    else:
+        state.token_cache.pop(customer, None)
+    save()
@@ -0,0 +1,119 @@
+import os
+import re
+import json
+import threading
+from datetime import datetime
+import state
+
+# -------------------------------------------------------------------
+# Upload journal
+# -------------------------------------------------------------------
+# One append-only JSON-lines file per customer/prefix. The first line
+# describes the batch, every following line records a file state change;
+# on load the last record per file wins.
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+
+def _journal_dir():
+    return os.path.join(state.BASE_DIR or os.getcwd(), "journals")
+
+
+def _safe_name(value):
+    return re.sub(r"[^A-Za-z0-9._-]", "_", value or "default")
+
+
+def _file_signature(file_path):
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None, None
+    return stat.st_size, int(stat.st_mtime)
+
+
+class UploadJournal:
+    """On-disk record of an upload batch so an interrupted batch can be resumed."""
+
+    def __init__(self, customer, prefix):
+        self.customer = customer
+        self.prefix = prefix
+        self.path = os.path.join(_journal_dir(), f"upload_{_safe_name(customer)}_{_safe_name(prefix)}.jsonl")
+        self.files = {}
+        self._lock = threading.Lock()
+        self._handle = None
+
+    @classmethod
+    def load(cls, customer, prefix):
+        """Return the last batch journal for customer/prefix, or None if there is none."""
+        journal = cls(customer, prefix)
+        if not os.path.exists(journal.path):
+            return None
+
+        with open(journal.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # torn final line from a crash
+                if "path" in record:
+                    journal.files[record["path"]] = record
+        return journal
+
+    def start_batch(self, file_paths):
+        """Start a fresh journal listing every file of the batch as pending."""
+        os.makedirs(_journal_dir(), exist_ok=True)
+        self.close()
+        self.files = {}
+        with self._lock:
+            self._handle = open(self.path, "w", encoding="utf-8")
+            self._write({"customer": self.customer, "prefix": self.prefix,
+                         "created": datetime.now().isoformat(timespec="seconds")})
+            for file_path in file_paths:
+                self._record(file_path, PENDING)
+
+    def mark(self, file_path, status):
+        with self._lock:
+            if self._handle is None:
+                self._handle = open(self.path, "a", encoding="utf-8")
+            self._record(file_path, status)
+
+    def pending_files(self):
+        """Files still to upload: not done, or changed on disk since they were uploaded."""
+        pending = []
+        for file_path, record in self.files.items():
+            if not os.path.exists(file_path):
+                continue
+            size, mtime = _file_signature(file_path)
+            if record["state"] != DONE or record["size"] != size or record["mtime"] != mtime:
+                pending.append(file_path)
+        return pending
+
+    def counts(self):
+        result = {PENDING: 0, DONE: 0, FAILED: 0}
+        for record in self.files.values():
+            result[record["state"]] = result.get(record["state"], 0) + 1
+        return result
+
+    def close(self):
+        with self._lock:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+
+    def remove(self):
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def _record(self, file_path, status):
+        size, mtime = _file_signature(file_path)
+        record = {"path": file_path, "state": status, "size": size, "mtime": mtime}
+        self.files[file_path] = record
+        self._write(record)
+
+    def _write(self, record):
+        self._handle.write(json.dumps(record) + "\n")
+        self._handle.flush()
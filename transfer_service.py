@@ -0,0 +1,673 @@
+import os
+import re
+import json
+import queue
+import threading
+from datetime import datetime
+import concurrent.futures
+import state
+from api import get_access_token, invalidate_token, customer_snapshot
+from log_utils import log_message
+from config_store import int_setting
+from session_utils import get_api_session, get_par_session
+from multipart_upload import should_use_multipart, upload_multipart
+from ranged_download import download_object, JOURNAL_SUFFIX
+from concurrency_utils import data_budget, api_budget, is_throttle_error
+from transfer_journal import DONE, FAILED
+from bandwidth_utils import ThrottledReader, is_limited
+from retry_utils import send_with_retry
+from listing_stream import ResultSetParser
+import listing_cache
+import par_cache
+import async_engine
+
+# -------------------------------------------------------------------
+# FTS operations without any UI dependency.
+# file_operations.py wires these to Tkinter, cli.py to the command line.
+# -------------------------------------------------------------------
+
+
+class TransferError(Exception):
+    """Raised when an FTS operation cannot be carried out at all."""
+
+
+class AuthError(TransferError):
+    """Raised when no access token can be obtained for the selected customer."""
+
+
+def _headers(customer, content_type=False):
+    access_token = get_access_token(customer)
+    if not access_token:
+        raise AuthError("Failed to retrieve access token.")
+
+    headers = {
+        "Authorization": f"Bearer {access_token}",
+        "Accept": "application/json",
+        "Accept-Language": "en-US",
+    }
+    if content_type:
+        headers["Content-Type"] = "application/json"
+    return headers
+
+
+def _api_call(customer, method, url, send, content_type=False, extra_headers=None):
+    """
+    Call send(headers) -> requests.Response under the retry policy with fresh FTS headers for
+    customer (a CustomerSnapshot). A 401 means the token was revoked or expired early: it is
+    dropped and the call is sent once more with a new one.
+    """
+    for attempt in range(2):
+        headers = _headers(customer, content_type)
+        if extra_headers:
+            headers.update(extra_headers)
+        response = send_with_retry(method, url, lambda: send(headers))
+        if response.status_code != 401 or attempt:
+            return response
+        response.close()
+        invalidate_token(headers["Authorization"][len("Bearer "):], customer.key)
+
+
+LISTING_CHUNK_SIZE = 64 * 1024
+PAR_EXPIRED_STATUSES = (401, 403, 404)     # object storage answers for a PAR that is no longer valid
+FAILED_STATUSES = ("failed", "failure", "error", "not_found", "notfound")
+SPLIT_STATUSES = (400, 413, 422)     # a chunk refused for some of its files; nothing of it was applied
+
+
+def _as_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def fetch_prefixes(customer=None):
+    """Return the customer's storage prefixes sorted case-insensitively; a fresh cached list is reused."""
+    customer = customer or customer_snapshot()
+    entry = listing_cache.get(listing_cache.PREFIXES, customer=customer.key)
+    if entry and entry.is_fresh():
+        return entry.rows
+    return refresh_prefixes(entry, customer).rows
+
+
+def refresh_prefixes(entry=None, customer=None):
+    """
+    Fetch the prefix list and return its listing_cache entry. When entry (a stale cached
+    listing) is given the request is conditional, and an unchanged list returns entry itself.
+    """
+    customer = customer or customer_snapshot()
+    url = f"{customer.host}/listprefixes"
+    response = _api_call(customer, "GET", url, lambda headers: get_api_session(customer.key).get(url, headers=headers),
+                         extra_headers=entry.conditional_headers() if entry else None)
+    if entry and response.status_code == 304:
+        entry.touch()
+        return entry
+
+    response.raise_for_status()
+    response_data = response.json()
+
+    if not isinstance(response_data, list):
+        raise TransferError("Unexpected API response format.")
+    return listing_cache.put(listing_cache.PREFIXES, "", sorted(response_data, key=str.lower),
+                             response.headers.get("ETag"), response.headers.get("Last-Modified"), customer=customer.key,
+                             ttl_seconds=listing_cache.ttl(customer.config))
+
+
+def stream_files(prefix, on_batch=None, entry=None, batch_size=None, customer=None):
+    """
+    Fetch the listing (resultSet) of a storage prefix and return its listing_cache entry.
+    Rows are parsed while the response is still streaming in and handed to on_batch(rows) in
+    batches; when the service pages its answer (opc-next-page header) the following pages are
+    requested too. When entry (a stale cached listing) is given the request is conditional,
+    and an unchanged listing returns entry itself without calling on_batch.
+    """
+    batch_size = batch_size or state.LISTING_BATCH_SIZE
+    customer = customer or customer_snapshot()
+    base_url = f"{customer.host}/listfiles?prefix={prefix}"
+    url = base_url
+    rows = []
+    validators = (None, None)
+    first_page = True
+
+    while url:
+        response = _api_call(customer, "GET", url,
+                             lambda headers: get_api_session(customer.key).get(url, headers=headers, stream=True),
+                             extra_headers=entry.conditional_headers() if entry and first_page else None)
+        try:
+            if entry and first_page and response.status_code == 304:
+                entry.touch()
+                return entry
+
+            response.raise_for_status()
+            parser = ResultSetParser()
+            batch = []
+            for chunk in response.iter_content(chunk_size=LISTING_CHUNK_SIZE):
+                new_rows = parser.feed(chunk)
+                rows.extend(new_rows)
+                batch.extend(new_rows)
+                if on_batch and len(batch) >= batch_size:
+                    on_batch(batch)
+                    batch = []
+            parser.close()
+        except ValueError:
+            raise TransferError("Unexpected API response format.")
+        finally:
+            response.close()
+
+        if on_batch and batch:
+            on_batch(batch)
+
+        next_page = response.headers.get("opc-next-page")
+        if first_page and not next_page:
+            # only a single-page listing can be revalidated as a whole
+            validators = (response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        url = f"{base_url}&page={next_page}" if next_page else None
+        first_page = False
+
+    # cached under the customer the request was made for, whoever is selected by now
+    return listing_cache.put(listing_cache.FILES, prefix, rows, *validators, customer=customer.key,
+                             ttl_seconds=listing_cache.ttl(customer.config))
+
+
+def fetch_files(prefix, customer=None):
+    """Return the whole listing (resultSet) of a storage prefix; a fresh cached listing is reused."""
+    customer = customer or customer_snapshot()
+    entry = listing_cache.get(listing_cache.FILES, prefix, customer=customer.key)
+    if entry and entry.is_fresh():
+        return entry.rows
+    return stream_files(prefix, entry=entry, customer=customer).rows
+
+
+def request_pars(endpoint, prefix, file_names, customer=None):
+    """Request PARs from /upload or /download and return the parList entries."""
+    customer = customer or customer_snapshot()
+    api_url = f"{customer.host}/{endpoint}"
+    payload = {
+        "listOfFiles": [{"storagePrefix": prefix, "fileName": file_name} for file_name in file_names]
+    }
+
+    log_message(f"API Used: {api_url}")
+    response = _api_call(customer, "POST", api_url,
+                         lambda headers: get_api_session(customer.key).post(api_url, headers=headers, json=payload),
+                         content_type=True)
+    response.raise_for_status()
+    return response.json().get("parList", [])
+
+
+def get_pars(endpoint, prefix, file_names, customer=None):
+    """
+    Return {file_name: accessUri} from /upload or /download. Cached PARs that stay valid past the
+    refresh margin are reused; only the missing or nearly expired ones are requested, in one call.
+    """
+    customer = customer or customer_snapshot()
+    pars, missing = par_cache.lookup(customer.key, endpoint, prefix, file_names)
+    if pars:
+        log_message(f"Reusing {len(pars)} cached PAR(s) for {endpoint}.")
+    if missing:
+        pars.update(par_cache.store(customer.key, endpoint, prefix,
+                                     request_pars(endpoint, prefix, missing, customer)))
+    return pars
+
+
+def upload_file(file_path, access_uri, customer=None):
+    """
+    Upload a single file to its PAR access URI under customer's (a CustomerSnapshot) multipart
+    settings and bandwidth limit. Returns (succeeded, HTTP status or None).
+    """
+    customer = customer or customer_snapshot()
+    file_name = os.path.basename(file_path)
+    try:
+        file_size = os.path.getsize(file_path)
+        if should_use_multipart(file_size, customer.config):
+            ok, status = upload_multipart(file_path, access_uri, customer)
+            if ok:
+                log_message(f"✅ File {file_name} uploaded successfully.")
+                return True, status
+            log_message(f"Failed to upload {file_name}. Error: multipart upload failed (HTTP {status})")
+            return False, status
+
+        def put_once():
+            if file_size == 0:
+                return get_par_session().put(access_uri, data=b'', headers={"Content-Length": "0"})
+            with open(file_path, "rb") as file:
+                body = ThrottledReader(file, file_size, customer.key) if is_limited(customer.key) else file
+                return get_par_session().put(access_uri, data=body)
+
+        put_response = send_with_retry("PUT", access_uri, put_once)
+
+        if put_response.status_code == 200:
+            log_message(f"✅ File {file_name} uploaded successfully.")
+            return True, 200
+        log_message(f"Failed to upload {file_name}. Error: {put_response.text}")
+        return False, put_response.status_code
+    except Exception as e:
+        if is_throttle_error(e):
+            data_budget.record(throttled=True)
+        log_message(f"ERROR! - uploading file {file_name}: {str(e)}")
+        return False, None
+
+
+def _prefetch_pars(endpoint, prefix, batches, ahead, customer):
+    """
+    Request the PARs of each batch of file paths on a helper thread, at most `ahead` batches
+    ahead of the caller. Returns (ready, done, stop): ready yields (batch, {name: accessUri}, error)
+    and finally None; the caller calls done() once a batch's transfers have all finished, and
+    stop() when it leaves, so the helper thread requests no more PARs and ends.
+    """
+    ready = queue.Queue()
+    slots = threading.Semaphore(ahead)
+    stopped = threading.Event()
+
+    def acquire():
+        for batch in batches:
+            slots.acquire()
+            if stopped.is_set():
+                break
+            try:
+                pars = get_pars(endpoint, prefix, [os.path.basename(p) for p in batch], customer)
+            except Exception as e:
+                ready.put((batch, None, e))
+                break
+            ready.put((batch, pars, None))
+        ready.put(None)
+
+    def stop():
+        stopped.set()
+        slots.release()  # wakes the helper if it waits for a slot
+
+    threading.Thread(target=acquire, name="fts-par-prefetch", daemon=True).start()
+    return ready, slots.release, stop
+
+
+def upload_batch(file_paths, prefix, journal=None, customer=None):
+    """
+    Upload local files to a prefix and return {file_path: succeeded}.
+    PARs are requested in batches of PAR_BATCH_SIZE while earlier batches upload, so the
+    transfers never wait for the control plane; files whose PAR was refused as expired get a
+    fresh PAR and one more attempt. Each outcome is recorded in the journal, which is removed
+    once nothing is left pending. The customer (host and credentials) is fixed when the batch starts.
+    """
+    customer = customer or customer_snapshot()
+    log_message(f"Target prefix: {prefix}")
+    file_paths = list(file_paths)
+    results = {file_path: False for file_path in file_paths}
+    expired = []
+    expired_lock = threading.Lock()
+
+    def record(file_path, ok, status=None, retry=True):
+        if not ok and retry and status in PAR_EXPIRED_STATUSES:
+            with expired_lock:
+                expired.append(file_path)
+            return
+        results[file_path] = ok
+        if journal:
+            journal.mark(file_path, DONE if ok else FAILED)
+
+    def upload_worker(file_path, access_uri, retry=True):
+        with data_budget:
+            ok, status = upload_file(file_path, access_uri, customer)
+        record(file_path, ok, status, retry)
+
+    def dispatch(batch, pars, executor, retry=True):
+        """Start the uploads of one batch and return their futures."""
+        # the async engine cannot pace request bodies, so throttled uploads stay on threads
+        use_async = retry and not is_limited(customer.key)
+        async_jobs = []
+        futures = []
+        for file_path in batch:
+            file_name = os.path.basename(file_path)
+            if file_name not in pars:
+                log_message(f"No matching entry found for {file_name} in the response.")
+                record(file_path, False, retry=False)
+                continue
+
+            access_uri = pars[file_name]
+            if not access_uri:
+                log_message(f"ERROR! - Failed to get accessUri for {file_name}")
+                record(file_path, False, retry=False)
+                continue
+
+            try:
+                # Small files run as coroutines on the engine loop while large ones use the thread pool
+                small = use_async and async_engine.accepts(os.path.getsize(file_path))
+            except OSError as e:
+                # deleted or renamed since it was selected
+                log_message(f"ERROR! - uploading file {file_name}: {str(e)}")
+                record(file_path, False, retry=False)
+                continue
+            if small:
+                async_jobs.append((file_path, access_uri))
+            else:
+                futures.append(executor.submit(upload_worker, file_path, access_uri, retry))
+
+        if async_jobs:
+            futures.append(async_engine.upload_many(async_jobs, on_result=record, customer=customer.key))
+        return futures
+
+    batch_size = max(state.PAR_BATCH_SIZE, 1)
+    batches = [file_paths[i:i + batch_size] for i in range(0, len(file_paths), batch_size)]
+    ready, batch_done, stop_prefetch = _prefetch_pars("upload", prefix, batches,
+                                                      max(state.PAR_PREFETCH_BATCHES, 1), customer)
+
+    try:
+        # pool sized to the budget's current limit; data_budget decides how many actually run
+        with concurrent.futures.ThreadPoolExecutor(max_workers=data_budget.limit) as executor:
+            all_futures = []
+            first = True
+            while True:
+                item = ready.get()
+                if item is None:
+                    break
+                batch, pars, error = item
+                if error is not None:
+                    if first:
+                        raise error
+                    log_message(f"ERROR! - Failed to get PARs for {len(batch)} file(s), stopping the batch: {error}")
+                    break
+                first = False
+
+                futures = dispatch(batch, pars, executor)
+                all_futures.extend(futures)
+                if futures:
+                    remaining = [len(futures)]
+                    remaining_lock = threading.Lock()
+
+                    def finished(future, remaining=remaining, remaining_lock=remaining_lock):
+                        with remaining_lock:
+                            remaining[0] -= 1
+                            last = remaining[0] == 0
+                        if last:
+                            batch_done()  # lets the next PAR batch be requested
+
+                    for future in futures:
+                        future.add_done_callback(finished)
+                else:
+                    batch_done()
+            concurrent.futures.wait(all_futures)
+
+            if expired:
+                log_message(f"{len(expired)} PAR(s) expired before use, requesting new ones.")
+                for start in range(0, len(expired), batch_size):
+                    batch = expired[start:start + batch_size]
+                    for file_path in batch:
+                        par_cache.discard(customer.key, "upload", prefix, os.path.basename(file_path))
+                    pars = get_pars("upload", prefix, [os.path.basename(p) for p in batch], customer)
+                    concurrent.futures.wait(dispatch(batch, pars, executor, retry=False))
+    finally:
+        stop_prefetch()
+        if journal:
+            if journal.pending_files():
+                journal.close()
+            else:
+                journal.remove()
+        listing_cache.invalidate_files(prefix, customer=customer.key)
+    return results
+
+
+def download_batch(file_names, prefix, save_directory, listing=None, customer=None):
+    """
+    Download files of a prefix into save_directory and return {file_name: succeeded}.
+    listing maps file names to their listing entries, used to validate resumable downloads.
+    Cached PARs are reused; files whose PAR was refused as expired get a fresh one and one
+    more attempt.
+    """
+    customer = customer or customer_snapshot()
+    listing = listing or {}
+    log_message(f"Selected Prefix: {prefix}")
+    requested = [os.path.basename(name) for name in file_names]
+    pars = get_pars("download", prefix, requested, customer)
+    if not pars:
+        raise TransferError("Unexpected API response format.")
+
+    results = {file_name: False for file_name in pars}
+    for file_name in requested:
+        if file_name not in results:
+            log_message(f"No matching entry found for {file_name} in the response.")
+            results[file_name] = False
+    expired = []
+    expired_lock = threading.Lock()
+
+    def record(file_name, ok, status=None, retry=True):
+        if not ok and retry and status in PAR_EXPIRED_STATUSES:
+            with expired_lock:
+                expired.append(file_name)
+            return
+        results[file_name] = ok
+
+    def download_worker(file_name, access_uri, retry=True):
+        if not access_uri:
+            log_message(f"No access URI for {file_name}, skipping download.")
+            return
+
+        try:
+            file_path = os.path.join(save_directory, file_name)
+            with data_budget:
+                download_object(access_uri, file_path, listing.get(os.path.basename(file_name)), customer.key)
+
+            log_message(f"✅ {file_name} downloaded successfully.")
+            record(file_name, True)
+        except Exception as e:
+            if is_throttle_error(e):
+                data_budget.record(throttled=True)
+            status = getattr(getattr(e, "response", None), "status_code", None)
+            if retry and status in PAR_EXPIRED_STATUSES:
+                record(file_name, False, status)
+                return
+            log_message(f"ERROR! - Failed to download {file_name}: {e}")
+
+    def run(pars, retry=True):
+        async_jobs = []
+        thread_jobs = []
+        for file_name, access_uri in pars.items():
+            file_path = os.path.join(save_directory, file_name or "")
+            size = listing.get(os.path.basename(file_name or ""), {}).get("size")
+            resumable = os.path.exists(file_path + JOURNAL_SUFFIX)
+            if retry and access_uri and not resumable and async_engine.accepts(_as_int(size)):
+                async_jobs.append((file_name, access_uri, file_path))
+            else:
+                thread_jobs.append((file_name, access_uri))
+
+        async_future = (async_engine.download_many(async_jobs, on_result=record, customer=customer.key)
+                        if async_jobs else None)
+
+        if thread_jobs:
+            workers = min(data_budget.limit, len(thread_jobs))
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                for file_name, access_uri in thread_jobs:
+                    executor.submit(download_worker, file_name, access_uri, retry)
+
+        if async_future:
+            async_future.result()
+
+    run(pars)
+    if expired:
+        log_message(f"{len(expired)} PAR(s) expired before use, requesting new ones.")
+        for file_name in expired:
+            par_cache.discard(customer.key, "download", prefix, file_name)
+        run(get_pars("download", prefix, expired, customer), retry=False)
+    return results
+
+
+def _entry_name(entry):
+    name = entry.get("fileName") or entry.get("name")
+    if not name and isinstance(entry.get("currentPath"), dict):
+        name = entry["currentPath"].get("fileName")
+    return os.path.basename(name) if name else None
+
+
+def _itemized_results(response):
+    """
+    Map file name -> succeeded from a batched /delete or /movefiles response, or None when the
+    body does not list files. Entries count as failed when they carry an error or a failure status.
+    When the body lists files, the ones it does not mention are left out; callers count them as failed.
+    """
+    try:
+        data = response.json()
+    except ValueError:
+        return None
+
+    entries = data if isinstance(data, list) else None
+    if isinstance(data, dict):
+        entries = next((value for value in data.values() if isinstance(value, list)), None)
+    if not entries:
+        return None
+
+    results = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        name = _entry_name(entry)
+        if not name:
+            continue
+        status = str(entry.get("status", "")).lower()
+        failed = entry.get("error") or entry.get("errorMessage") or status in FAILED_STATUSES
+        results[name] = not failed
+    return results or None
+
+
+def _run_chunked(file_names, chunk_size, send_chunk, on_result, done_message, split_statuses=SPLIT_STATUSES):
+    """
+    Issue send_chunk(names) -> response for chunks of file_names in parallel under the API budget
+    and call on_result(name, ok, detail, status) per file. When the response lists files, their
+    individual outcomes are used and files it does not mention count as failed; only a 2xx
+    without a per-file body counts the whole chunk as succeeded. A chunk refused
+    with one of split_statuses is split in halves until the failing files are isolated; any other
+    failure (5xx, 429 once the retries are spent, 401/403) fails the whole chunk, so an overloaded
+    service is not hit with ever more requests.
+    """
+
+    def run(chunk):
+        try:
+            with api_budget:
+                response = send_chunk(chunk)
+        except Exception as e:
+            if is_throttle_error(e):
+                api_budget.record(throttled=True)
+            for file_name in chunk:
+                on_result(file_name, False, f"request error: {e}", None)
+            return
+
+        if 200 <= response.status_code < 300:
+            itemized = _itemized_results(response)
+            if itemized is None:
+                itemized = dict.fromkeys(chunk, True)
+            succeeded = sum(1 for file_name in chunk if itemized.get(file_name))
+            log_message(f"✅ {succeeded} of {len(chunk)} file(s) {done_message}")
+            for file_name in chunk:
+                detail = "rejected by the service" if file_name in itemized else "not reported by the service"
+                on_result(file_name, itemized.get(file_name, False), detail, response.status_code)
+        elif len(chunk) > 1 and response.status_code in split_statuses:
+            middle = len(chunk) // 2
+            run(chunk[:middle])
+            run(chunk[middle:])
+        else:
+            for file_name in chunk:
+                on_result(file_name, False, f"HTTP {response.status_code}: {response.text}", response.status_code)
+
+    chunks = [file_names[i:i + chunk_size] for i in range(0, len(file_names), chunk_size)]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(api_budget.limit, len(chunks) or 1)) as executor:
+        executor.map(run, chunks)
+
+
+def delete_batch(file_names, prefix, on_deleted=None, customer=None):
+    """
+    Delete files from a prefix and return {file_name: succeeded}; on_deleted(name) fires per success.
+    Files are sent in chunks of delete_batch_size (customer section) per /delete call.
+    """
+    customer = customer or customer_snapshot()
+    api_url = f"{customer.host}/delete"
+    _headers(customer)  # fail fast without a token; every chunk fetches its own in case it expires mid-batch
+    results = {file_name: False for file_name in file_names}
+
+    def send(chunk):
+        payload = {"listOfFiles": [{"storagePrefix": prefix, "fileName": file_name} for file_name in chunk]}
+        return _api_call(customer, "DELETE", api_url, lambda headers: get_api_session(customer.key).delete(
+            api_url, headers=headers, data=json.dumps(payload)), content_type=True)
+
+    def on_result(file_name, ok, detail, status):
+        results[file_name] = ok
+        if not ok:
+            log_message(f"❌ Failed to delete '{file_name}': {detail}")
+            return
+        par_cache.discard(customer.key, "download", prefix, file_name)
+        if on_deleted:
+            on_deleted(file_name)
+
+    chunk_size = max(int_setting(customer.config, "delete_batch_size", state.DELETE_BATCH_SIZE), 1)
+    _run_chunked(list(file_names), chunk_size, send, on_result, f"deleted successfully from '{prefix}'")
+    listing_cache.invalidate_files(prefix, customer=customer.key)
+    return results
+
+
+RENAME_TOKEN = re.compile(r"\{(name|stem|ext|n|date)\}")
+
+
+def apply_rename_template(template, file_names):
+    """
+    Return the new names for file_names under a rename template. Placeholders: {name} (whole
+    name), {stem}, {ext} (with its dot), {n} (1-based position) and {date} (today, YYYYMMDD);
+    any other text is kept literally. An empty template keeps the names.
+    """
+    if not template:
+        return list(file_names)
+
+    today = datetime.now().strftime("%Y%m%d")
+    new_names = []
+    for position, file_name in enumerate(file_names, start=1):
+        stem, ext = os.path.splitext(file_name)
+        values = {"name": file_name, "stem": stem, "ext": ext, "n": str(position), "date": today}
+        new_names.append(RENAME_TOKEN.sub(lambda match: values[match.group(1)], template))
+    return new_names
+
+
+def move_batch(current_prefix, moves, on_moved=None, customer=None):
+    """
+    Move files and return {file_name: succeeded}; moves is a list of (file_name, new_prefix,
+    new_file_name) and on_moved(name) fires per success. Files are sent in chunks of
+    move_batch_size (customer section) per /movefiles call.
+    """
+    customer = customer or customer_snapshot()
+    api_url = f"{customer.host}/movefiles"
+    _headers(customer)  # fail fast without a token; every chunk fetches its own in case it expires mid-batch
+    targets = {file_name: (new_prefix, new_file_name) for file_name, new_prefix, new_file_name in moves}
+    if len(set(targets.values())) != len(targets):
+        raise TransferError("Several files would be moved to the same name; use {name}, {stem} or {n} in the new name.")
+    results = {file_name: False for file_name in targets}
+
+    def send(chunk):
+        payload = {
+            "listOfFiles": [
+                {
+                    "currentPath": {"storagePrefix": current_prefix, "fileName": file_name},
+                    "newPath": {"storagePrefix": targets[file_name][0], "fileName": targets[file_name][1]},
+                }
+                for file_name in chunk
+            ]
+        }
+        # /movefiles is not idempotent, so it is only repeated when the service did not process it
+        return _api_call(customer, "POST", api_url,
+                         lambda headers: get_api_session(customer.key).post(api_url, json=payload, headers=headers),
+                         content_type=True)
+
+    def on_result(file_name, ok, detail, status):
+        results[file_name] = ok
+        if not ok:
+            log_message(f"❌ Failed to move '{file_name}': {detail}")
+            if status is None or status >= 500:
+                # the chunk may have been partly applied before the service failed
+                log_message(f"⚠️ '{file_name}' may have been moved anyway; refresh the listings to check.")
+            return
+        par_cache.discard(customer.key, "download", current_prefix, file_name)
+        if on_moved:
+            on_moved(file_name)
+
+    new_prefixes = sorted({new_prefix for new_prefix, _ in targets.values()})
+    log_message(f"API used for file move : {api_url}")
+    chunk_size = max(int_setting(customer.config, "move_batch_size", state.MOVE_BATCH_SIZE), 1)
+    try:
+        # /movefiles is not idempotent: a chunk is only split (re-sent in halves) after an answer
+        # that guarantees none of it was applied, never after a 5xx that may have moved some files
+        _run_chunked(list(targets), chunk_size, send, on_result,
+                     f"moved successfully from '{current_prefix}' to {', '.join(new_prefixes)}")
+    finally:
+        listing_cache.invalidate_files(current_prefix, *new_prefixes, customer=customer.key)
+    return results
@@ -0,0 +1,112 @@
+import sys
+import queue
+
+# -------------------------------------------------------------------
+# UI event queue
+# -------------------------------------------------------------------
+# Tk widgets may only be touched from the main loop. Worker threads post
+# events here instead, and the main loop drains the queue every frame:
+#   - log lines are inserted into the log window with one insert per frame,
+#   - batched events with the same key are handed to their handler together
+#     (e.g. all grid removals of a frame trigger one re-render),
+#   - everything else (dialogs, widget updates) runs in order.
+# Without a started UI (command line) posted callbacks run immediately.
+FRAME_MS = 50
+MAX_LOG_WINDOW_LINES = 5000     # older lines are trimmed from the window (the log file keeps them)
+
+_queue = queue.Queue()
+_root = None
+_log_window = None
+_colors = set()
+
+
+def start(root, log_window=None):
+    """Start draining on root's main loop; call once the widgets exist."""
+    global _root, _log_window
+    _root = root
+    _log_window = log_window
+    root.after(FRAME_MS, _drain)
+
+
+def is_started():
+    return _root is not None
+
+
+def post(callback, *args):
+    """Run callback(*args) on the Tk main loop."""
+    if _root is None:
+        callback(*args)
+        return
+    _queue.put(("call", callback, args))
+
+
+def post_batch(key, handler, item):
+    """Queue item; once per frame handler(items) runs with every item posted under key."""
+    if _root is None:
+        handler([item])
+        return
+    _queue.put(("batch", key, (handler, item)))
+
+
+def post_log(text, color):
+    _queue.put(("log", color, text))
+
+
+def _insert_log(lines):
+    for color in {color for color, _ in lines} - _colors:
+        _log_window.tag_config(color, foreground=color)
+        _colors.add(color)
+
+    # consecutive lines of one color share a single insert
+    run_color, run = None, []
+    for color, text in lines:
+        if color != run_color and run:
+            _log_window.insert("end", "".join(run), run_color)
+            run = []
+        run_color = color
+        run.append(text)
+    if run:
+        _log_window.insert("end", "".join(run), run_color)
+
+    extra = int(_log_window.index("end-1c").split(".")[0]) - MAX_LOG_WINDOW_LINES
+    if extra > 0:
+        _log_window.delete("1.0", f"{extra + 1}.0")
+    _log_window.yview("end")
+
+
+def _drain():
+    # schedule the next frame first so a modal dialog below does not stop the queue
+    _root.after(FRAME_MS, _drain)
+
+    events = []
+    while True:
+        try:
+            events.append(_queue.get_nowait())
+        except queue.Empty:
+            break
+    if not events:
+        return
+
+    lines = [(color, text) for kind, color, text in events if kind == "log"]
+    if lines and _log_window is not None:
+        _insert_log(lines)
+
+    batches = {}
+    for kind, key, payload in events:
+        if kind == "batch":
+            handler, item = payload
+            batches.setdefault(key, (handler, []))[1].append(item)
+    for handler, items in batches.values():
+        _run(handler, items)
+
+    for kind, callback, args in events:
+        if kind == "call":
+            _run(callback, *args)
+
+
+def _run(callback, *args):
+    # one failing update must not drop the rest of the frame
+    try:
+        callback(*args)
+    except Exception as e:
+        print(f"⚠️ UI update failed: {e!r}", file=sys.stderr)
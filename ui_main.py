@@ -1,21 +1,32 @@
 import tkinter as tk
 import os
-from tkinter import ttk, scrolledtext, messagebox
+import threading
+from tkinter import ttk, scrolledtext
 from encryption_utils import initialize_encryption
 #from log_utils import setup_logging
-from file_operations import (
-    upload_files, download_files, delete_selected_files, move_file,list_prefixes,list_files
-)
 from ui_utils import (
-     load_image,apply_filter,sort_by_column,export_to_csv,preview_readme,reset_app
+     load_logo,apply_filter,sort_by_column,export_to_csv,preview_readme,reset_app
 )
 import state
-from config_utils import load_config,set_customer_config,add_customer_keys
+import ui_events
+import startup_timing
+from virtual_grid import VirtualGrid
+from config_utils import load_config,set_customer_config,add_customer_keys,customer_sections
+
+def _file_operation(name):
+    """Button command running file_operations.<name>; the module (requests, transfer engine) loads in the background."""
+    def command():
+        import file_operations
+        getattr(file_operations, name)()
+    return command
+
+def _preload_file_operations():
+    import file_operations
+    startup_timing.mark("modules loaded")
 
 def launch_main_ui():
     root = tk.Tk()
     root.withdraw()
-    initialize_encryption(root)
 
     root.title("File Transfer Service")
     root.geometry("950x630")
@@ -25,15 +36,11 @@ def launch_main_ui():
     company_logo_path = os.path.join(state.BASE_DIR, "resources", "company_logo.PNG")
     fts_logo_path = os.path.join(state.BASE_DIR, "resources", "fts_logo.PNG")
 
-    olr_logo = load_image(company_logo_path, size=(115, 70))
-    fts_logo = load_image(fts_logo_path, size=(120, 70))
-
-
-
-    if olr_logo:
-        tk.Label(logo_frame, image=olr_logo).pack(side="left", padx=5)
-    if fts_logo:
-        tk.Label(logo_frame, image=fts_logo).pack(side="left", padx=5)
+    # logos are filled in once ui_events runs, see load_logo
+    olr_logo_label = tk.Label(logo_frame)
+    olr_logo_label.pack(side="left", padx=5)
+    fts_logo_label = tk.Label(logo_frame)
+    fts_logo_label.pack(side="left", padx=5)
 
     state.customer_frame = tk.Frame(root)
     state.customer_frame.pack(pady=5, padx=10, fill="x")
@@ -45,7 +52,7 @@ def launch_main_ui():
     state.customer_dropdown = ttk.Combobox(state.customer_frame, width=state.dropdown_width, state="readonly")
     state.customer_dropdown.pack(side="left", padx=16)
     load_config()
-    state.customer_dropdown["values"] = [s for s in state.config.sections() if s != "encryption"]
+    state.customer_dropdown["values"] = customer_sections(state.config)
     state.customer_dropdown.pack(side="left", padx=16)
     state.customer_dropdown.bind("<<ComboboxSelected>>", set_customer_config)
 
@@ -53,12 +60,13 @@ def launch_main_ui():
     state.prefix_dropdown = ttk.Combobox(state.prefix_frame, width=state.dropdown_width, state="readonly")
     state.prefix_dropdown.pack(side="left", padx=38)
 
-    tk.Button(state.prefix_frame, text="List Prefixes", command=list_prefixes).pack(side="left", padx=5)
-    tk.Button(state.prefix_frame, text="List Files", command=list_files).pack(side="left", padx=5)
-    tk.Button(state.prefix_frame, text="Upload", command=upload_files).pack(side="left", padx=5)
-    tk.Button(state.prefix_frame, text="Download", command=download_files).pack(side="left", padx=5)
-    tk.Button(state.prefix_frame, text="Delete", command=delete_selected_files).pack(side="left", padx=5)
-    tk.Button(state.prefix_frame, text="Move", command=move_file).pack(side="left", padx=5)
+    tk.Button(state.prefix_frame, text="List Prefixes", command=_file_operation("list_prefixes")).pack(side="left", padx=5)
+    tk.Button(state.prefix_frame, text="List Files", command=_file_operation("list_files")).pack(side="left", padx=5)
+    tk.Button(state.prefix_frame, text="Upload", command=_file_operation("upload_files")).pack(side="left", padx=5)
+    tk.Button(state.prefix_frame, text="Resume Upload", command=_file_operation("resume_upload")).pack(side="left", padx=5)
+    tk.Button(state.prefix_frame, text="Download", command=_file_operation("download_files")).pack(side="left", padx=5)
+    tk.Button(state.prefix_frame, text="Delete", command=_file_operation("delete_selected_files")).pack(side="left", padx=5)
+    tk.Button(state.prefix_frame, text="Move", command=_file_operation("move_file")).pack(side="left", padx=5)
     tk.Button(state.prefix_frame, text="⚙️", command=lambda: add_customer_keys(root)).pack(side="left", padx=5)
     tk.Button(state.prefix_frame, text="❓", command=preview_readme).pack(side="left", padx=5)
 
@@ -77,9 +85,9 @@ def launch_main_ui():
 
     columns = ("Name", "Size", "Created Date", "Modified Date", "Scan Status")
     state.file_tree = ttk.Treeview(frame, columns=columns, show="headings", selectmode="extended")
-    scroll_y = ttk.Scrollbar(frame, orient="vertical", command=state.file_tree.yview)
-    state.file_tree.configure(yscroll=scroll_y.set)
+    scroll_y = ttk.Scrollbar(frame, orient="vertical")
     scroll_y.pack(side="right", fill="y")
+    state.file_grid = VirtualGrid(state.file_tree, scroll_y)
 
     for col in columns:
         state.sort_orders[col] = False  # Default order is ascending
@@ -94,12 +102,25 @@ def launch_main_ui():
 
     state.filter_entry.bind("<KeyRelease>", apply_filter)  # Apply filter on key release
 
-    def select_all(event):
-        state.file_tree.selection_set(state.file_tree.get_children())
+    state.file_tree.bind("<Control-a>", state.file_grid.select_all)
 
-    state.file_tree.bind("<Control-a>", select_all)
+    ui_events.start(root, state.log_window)
+    load_logo(olr_logo_label, company_logo_path, size=(115, 70))
+    load_logo(fts_logo_label, fts_logo_path, size=(120, 70))
 
     #setup_logging()
 
     root.deiconify()
+    root.update()
+    startup_timing.mark("first window")
+
+    # the transfer modules import while the password is typed in
+    preload = threading.Thread(target=_preload_file_operations, name="preload", daemon=True)
+    preload.start()
+    if startup_timing.is_benchmark():
+        preload.join()
+        root.destroy()
+        return
+
+    initialize_encryption(root)
     root.mainloop()
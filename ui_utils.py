@@ -1,21 +1,63 @@
+import re
 import state
 import csv
 import os
-from datetime import datetime
+import threading
+import ui_events
 from log_utils import log_message
+from session_utils import close_sessions
+import listing_cache
+import par_cache
+import token_store
+from bandwidth_utils import reset_buckets
+from filter_index import ListingIndex
 import tkinter as tk
-from PIL import Image, ImageTk
 from tkinter import scrolledtext, filedialog, messagebox
 
-def load_image(path, size=(100, 50)):
+LOGO_CACHE_DIR = "cache"
+
+def _set_logo(label, image):
+    label.configure(image=image)
+    label.image = image  # Tk does not keep a reference of its own
+
+def _scaled_logo_path(path, size):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(state.BASE_DIR, LOGO_CACHE_DIR, f"{stem}_{size[0]}x{size[1]}.png")
+
+def load_logo(label, path, size=(100, 50)):
+    """
+    Show the image at path scaled to size in label. A pre-scaled copy from an earlier start
+    loads directly through Tk; otherwise PIL decodes and resizes it on a worker thread, the
+    copy is cached for the next start and the label is filled in once it is ready.
+    """
+    full_path = os.path.join(state.BASE_DIR, path)
+    scaled_path = _scaled_logo_path(full_path, size)
     try:
-        full_path = os.path.join(state.BASE_DIR, path)
-        img = Image.open(full_path)
-        img = img.resize(size, Image.LANCZOS)
-        return ImageTk.PhotoImage(img)
-    except Exception as e:
-        log_message(f"Warning: Failed to load image {path} - {e}")
-        return None
+        if os.path.getmtime(scaled_path) >= os.path.getmtime(full_path):
+            _set_logo(label, tk.PhotoImage(file=scaled_path))
+            return
+    except (OSError, tk.TclError):
+        pass
+
+    def scale():
+        try:
+            from PIL import Image  # imported here, off the startup path
+            with Image.open(full_path) as img:
+                scaled = img.resize(size, Image.LANCZOS)
+        except Exception as e:
+            log_message(f"Warning: Failed to load image {path} - {e}")
+            return
+        try:
+            os.makedirs(os.path.dirname(scaled_path), exist_ok=True)
+            temp_path = f"{scaled_path}.{os.getpid()}.tmp"
+            scaled.save(temp_path, format="PNG")
+            os.replace(temp_path, scaled_path)
+            ui_events.post(lambda: _set_logo(label, tk.PhotoImage(file=scaled_path)))
+        except OSError:
+            from PIL import ImageTk
+            ui_events.post(lambda: _set_logo(label, ImageTk.PhotoImage(scaled)))
+
+    threading.Thread(target=scale, name="load-logo", daemon=True).start()
 
 def preview_readme():
     try:
@@ -40,72 +82,64 @@ def preview_readme():
     except FileNotFoundError:
         messagebox.showerror("Error", "READ_ME.txt not found!")
 
+def _listing_index():
+    """Index of the current listing, rebuilt (and the filter re-run) whenever state.file_data is replaced."""
+    if state.listing_index is None or state.listing_index.rows is not state.file_data:
+        state.listing_index = ListingIndex(state.file_data)
+        state.filter_matches = None
+        query = state.filter_entry.get().strip() if state.filter_entry else ""
+        if query:
+            try:
+                state.filter_matches = state.listing_index.search(query)
+            except (ValueError, re.error):
+                pass
+    return state.listing_index
+
+def render_view():
+    """Show the filter matches in the order of the active sort column."""
+    index = _listing_index()
+    state.file_grid.set_rows(index.view(state.filter_matches, state.sort_column, state.sort_reverse))
+
+def append_rows(rows):
+    """Add a batch of a streaming listing to the end of the grid; finish_rows sorts and filters it."""
+    state.file_data.extend(rows)
+    state.listing_index = None  # the list grew in place, so the identity check cannot see it
+    state.file_grid.append_rows(rows)
+
+def finish_rows():
+    """Apply the filter and sort order once to a listing that has finished streaming."""
+    state.listing_index = None
+    render_view()
+
 def sort_by_column(col, reverse=None):
     if reverse is None:
         reverse = state.sort_orders.get(col, False)
     state.sort_orders[col] = not reverse
 
-    if col == "Created Date":
-        state.file_data = sorted(
-            state.file_data,
-            key=lambda x: datetime.strptime(x.get("createdDate", "1970-01-01T00:00:00Z"), "%Y-%m-%dT%H:%M:%SZ"),
-            reverse=reverse
-        )
-    elif col == "Modified Date":
-        state.file_data = sorted(
-            state.file_data,
-            key=lambda x: datetime.strptime(x.get("modifiedDate", "1970-01-01T00:00:00Z"), "%Y-%m-%dT%H:%M:%SZ"),
-            reverse=reverse
-        )
-    elif col == "Size":
-        state.file_data = sorted(
-            state.file_data,
-            key=lambda x: int(x.get("size", 0)),
-            reverse=reverse
-        )
-    else:
-        state.file_data = sorted(
-            state.file_data,
-            key=lambda x: x.get("name", "").lower(),
-            reverse=reverse
-        )
-
-    state.file_tree.delete(*state.file_tree.get_children())
-
-    for file in state.file_data:
-        state.file_tree.insert(
-            "",
-            "end",
-            values=(
-                file.get("name", "N/A"),
-                file.get("size", 0),
-                file.get("createdDate", "N/A"),
-                file.get("modifiedDate", "N/A"),
-                file.get("scanStatus", "N/A"),
-            ),
-        )
+    state.sort_column = col
+    state.sort_reverse = reverse
+    render_view()
 
     state.file_tree.heading(col, command=lambda _col=col: sort_by_column(_col, state.sort_orders[col]))
 
 def apply_filter(*args):
+    """Bound to every key press in the filter box; the grid refreshes once typing pauses."""
+    if state.filter_after_id:
+        state.filter_entry.after_cancel(state.filter_after_id)
+    state.filter_after_id = state.filter_entry.after(state.FILTER_DEBOUNCE_MS, refresh_filter)
 
-    filter_text = state.filter_entry.get().lower()
-    state.file_tree.delete(*state.file_tree.get_children())
+def refresh_filter():
 
-    for file in state.file_data:
-        file_name = file.get("name", "").lower()
-        if filter_text in file_name:
-            state.file_tree.insert(
-                "",
-                "end",
-                values=(
-                    file.get("name", "N/A"),
-                    file.get("size", 0),
-                    file.get("createdDate", "N/A"),
-                    file.get("modifiedDate", "N/A"),
-                    file.get("scanStatus", "N/A"),
-                ),
-            )
+    state.filter_after_id = None
+    index = _listing_index()
+    query = state.filter_entry.get().strip()
+
+    try:
+        state.filter_matches = index.search(query) if query else None
+    except (ValueError, re.error):
+        return  # keep the current rows while the query is incomplete
+
+    render_view()
 
 def export_to_csv():
     if not state.file_data:
@@ -126,7 +160,7 @@ def export_to_csv():
         with open(file_path, mode="w", newline="", encoding="utf-8") as file:
             writer = csv.writer(file)
             writer.writerow(["Name", "Size", "Created Date", "Modified Date", "Scan Status"])  # Header
-            for file in state.file_data:
+            for file in _listing_index().view(None, state.sort_column, state.sort_reverse):
                 writer.writerow([
                     file.get("name", "N/A"),
                     file.get("size", 0),
@@ -145,7 +179,11 @@ def reset_app():
 
     state.prefix_dropdown.set("")
     state.prefix_dropdown["values"] = []
-    state.token_cache.clear()
+    token_store.forget()
+    listing_cache.invalidate()
+    par_cache.clear()
+    close_sessions()
+    reset_buckets()
     state.customer_config.clear()
 
     state.fts_host_name = None
@@ -157,6 +195,6 @@ def reset_app():
     state.customer_dropdown.set("")
 
     state.filter_entry.delete(0, tk.END)
-    state.file_tree.delete(*state.file_tree.get_children())
+    state.file_grid.clear()
     state.log_window.delete("1.0", tk.END)
     log_message("Application reset successfully.")
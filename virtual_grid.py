@@ -0,0 +1,163 @@
+# -------------------------------------------------------------------
+# Virtualized file grid
+# -------------------------------------------------------------------
+# The Treeview only ever holds as many items as fit on screen. Scrolling
+# moves an offset into the row list and rewrites the values of those same
+# items, so listing, sorting and filtering 100k+ files stays interactive.
+DEFAULT_ROW_HEIGHT = 20
+WHEEL_ROWS = 3
+SHIFT_OR_CONTROL = 0x0001 | 0x0004     # Tk event.state modifier bits
+
+
+def row_values(file):
+    return (
+        file.get("name", "N/A"),
+        file.get("size", 0),
+        file.get("createdDate", "N/A"),
+        file.get("modifiedDate", "N/A"),
+        file.get("scanStatus", "N/A"),
+    )
+
+
+def row_key(file):
+    return file.get("name", "")
+
+
+class VirtualGrid:
+    """Draws the visible window of a list of file rows into a Treeview, recycling row items."""
+
+    def __init__(self, tree, scrollbar):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.rows = []
+        self.offset = 0
+        self.selected = set()
+        self._names = set()     # names of self.rows, for exact membership checks
+        self._items = []
+        self._item_rows = {}
+
+        scrollbar.configure(command=self.yview)
+        tree.configure(yscrollcommand="")
+        tree.bind("<Configure>", lambda event: self.render())
+        tree.bind("<<TreeviewSelect>>", self._on_select)
+        tree.bind("<Button-1>", self._on_click)
+        tree.bind("<MouseWheel>", self._on_mousewheel)
+        tree.bind("<Button-4>", lambda event: self.scroll(-WHEEL_ROWS))
+        tree.bind("<Button-5>", lambda event: self.scroll(WHEEL_ROWS))
+
+    # ---------------------------------------------------------------
+    # data
+    # ---------------------------------------------------------------
+    def set_rows(self, rows):
+        """Show a new row list (e.g. after listing, sorting or filtering); selection is kept by name."""
+        self.rows = rows
+        self._names = {row_key(file) for file in rows}
+        self.offset = min(self.offset, max(len(rows) - self.visible_count(), 0))
+        self.render()
+
+    def append_rows(self, rows):
+        """Add rows at the end, as they arrive, without rebuilding the row list."""
+        self.rows.extend(rows)
+        self._names.update(row_key(file) for file in rows)
+        self.render()
+
+    def clear(self):
+        self.rows = []
+        self._names = set()
+        self.offset = 0
+        self.selected.clear()
+        self.render()
+
+    def remove_names(self, file_names):
+        """Remove the rows with exactly these names in one pass and one re-render; returns the names found."""
+        found = {name for name in file_names if name in self._names}
+        if found:
+            self.selected -= found
+            self.set_rows([file for file in self.rows if row_key(file) not in found])
+        return found
+
+    def selected_rows(self):
+        return [file for file in self.rows if row_key(file) in self.selected]
+
+    def select_all(self, event=None):
+        self.selected = {row_key(file) for file in self.rows}
+        self.render()
+        return "break"
+
+    # ---------------------------------------------------------------
+    # viewport
+    # ---------------------------------------------------------------
+    def visible_count(self):
+        height = self.tree.winfo_height()
+        if height <= 1:  # not mapped yet
+            return int(self.tree.cget("height"))
+
+        header = 0
+        row_height = DEFAULT_ROW_HEIGHT
+        if self._items:
+            bbox = self.tree.bbox(self._items[0])
+            if bbox:
+                header, row_height = bbox[1], bbox[3]
+        return max(1, (height - header) // row_height)
+
+    def render(self):
+        visible = min(self.visible_count(), max(len(self.rows) - self.offset, 0))
+
+        while len(self._items) < visible:
+            self._items.append(self.tree.insert("", "end", values=()))
+        while len(self._items) > visible:
+            self.tree.delete(self._items.pop())
+
+        self._item_rows = {}
+        selection = []
+        for position, item in enumerate(self._items):
+            file = self.rows[self.offset + position]
+            self._item_rows[item] = file
+            self.tree.item(item, values=row_values(file))
+            if row_key(file) in self.selected:
+                selection.append(item)
+        self.tree.selection_set(selection)
+        self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        total = len(self.rows)
+        if not total:
+            self.scrollbar.set(0.0, 1.0)
+            return
+        self.scrollbar.set(self.offset / total, min((self.offset + len(self._items)) / total, 1.0))
+
+    def scroll(self, rows):
+        last_offset = max(len(self.rows) - self.visible_count(), 0)
+        new_offset = max(0, min(self.offset + rows, last_offset))
+        if new_offset != self.offset:
+            self.offset = new_offset
+            self.render()
+        return "break"
+
+    def yview(self, *args):
+        """Scrollbar command: ('moveto', fraction) or ('scroll', n, 'units'|'pages')."""
+        if not args:
+            return
+        if args[0] == "moveto":
+            self.scroll(int(float(args[1]) * len(self.rows)) - self.offset)
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if args[2] == "pages":
+                step *= max(self.visible_count() - 1, 1)
+            self.scroll(step)
+
+    def _on_mousewheel(self, event):
+        return self.scroll(-WHEEL_ROWS if event.delta > 0 else WHEEL_ROWS)
+
+    def _on_click(self, event):
+        # a plain click replaces the selection, including rows scrolled out of view
+        if not event.state & SHIFT_OR_CONTROL and self.tree.identify_region(event.x, event.y) == "cell":
+            self.selected.clear()
+
+    def _on_select(self, event=None):
+        selected_items = set(self.tree.selection())
+        for item, file in self._item_rows.items():
+            if item in selected_items:
+                self.selected.add(row_key(file))
+            else:
+                self.selected.discard(row_key(file))